@@ -2,130 +2,120 @@
 import streamlit as st
 import pandas as pd
 import io
-import os
 from datetime import datetime, date
-from extract_premium_summary import extract_from_pdf, extract_from_txt
-from extractor import extract_all_lic_data
-from utils import get_mysql_connection, get_policy_count_by_plan, load_lic_data_from_db, filter_df_by_selected_year, filter_df_by_financial_year
+from ingest import ingest_registers, ingest_premium_summary
+from migrations import ensure_migrated
+from jobs import submit_job, list_jobs, is_active
+from data_cache import bump_data_version, get_data_version
+from premium_queries import get_report_months, get_month_summary, get_eligible_premium
+from utils import get_mysql_connection, load_lic_doc_index, get_session_year_offsets, load_lic_summary, get_session_doc_ranges, get_headline_counts, ensure_session_migrated
 from db_utils import get_pending_users, add_user, delete_pending_user, get_all_users, update_user_role_and_start, delete_user
 from openpyxl import load_workbook
 from openpyxl.styles import numbers
+from search import build_search_keys, search_mask
+from policy_grid import show_policy_grid
+from doc_index import doc_slice
 from data_display_column import ADMIN_DISPLAY_COLUMNS as DISPLAY_COLUMNS
 
+JOB_POLL_SECONDS = 1.0
+LIC_VIEW_COLUMNS = [col for col in DISPLAY_COLUMNS if col != "S.No."]
 
-# --- File Upload Handlers ---
-def upload_lic_data(uploaded_file):
-    if "db_name" not in st.session_state:
-        st.error("🔒 Please log in first.")
-        return
-
-    # 1. Save uploaded file temporarily
-    with open("latest_uploaded.txt", "wb") as f:
-        f.write(uploaded_file.getbuffer())
-
-    # 2. Extract data using your custom logic
-    new_data = extract_all_lic_data("latest_uploaded.txt")
-    if new_data.empty:
-        st.warning("⚠️ No valid data found in uploaded file.")
-        return
-
-    db_name = st.session_state["db_name"]
-    engine = get_mysql_connection(db_name)
 
-    try:
-        # 3. Read existing data (if table exists)
-        try:
-            old_data = pd.read_sql("SELECT * FROM lic_data", con=engine)
-        except Exception:
-            old_data = pd.DataFrame()
+# --- File Upload Handlers ---
+def _job_owner():
+    return (st.session_state["db_name"], st.session_state["username"])
 
-        # 4. Combine and deduplicate
-        combined = pd.concat([old_data, new_data]).drop_duplicates(subset=["Policy No"], keep="last")
 
-        # Optional: Add uploader info
-        if "uploaded_by" not in combined.columns:
-            combined["uploaded_by"] = st.session_state["username"]
+def _ingest_and_invalidate(db_name, ingest, *args, report, **kwargs):
+    """Runs an ingest job and bumps the tenant's data_version once it has saved anything.
 
-        # 5. Save to MySQL (full overwrite — OK if only 1 agent per DB)
-        combined.to_sql("lic_data", con=engine, if_exists="replace", index=False)
+    The tenant is migrated first under the migration lock, so an upload during
+    the startup migration waits for it instead of upgrading tables alongside it.
+    """
+    ensure_migrated(db_name)
+    outcome = ingest(*args, report=report, **kwargs)
+    if outcome.status == "saved":
+        bump_data_version(db_name)
+    return outcome
 
-        st.success(f"✅ {len(combined)} proposals saved successfully.")
 
-    except Exception as e:
-        st.error(f"❌ Failed to save data: {e}")
+def upload_lic_data(uploaded_files):
+    """Queues a background ingest of one or more uploaded registers and returns its job id."""
+    if "db_name" not in st.session_state:
+        st.error("🔒 Please log in first.")
+        return None
 
-    finally:
-        # 6. Cleanup file
-        if os.path.exists("latest_uploaded.txt"):
-            os.remove("latest_uploaded.txt")
+    if not isinstance(uploaded_files, list):
+        uploaded_files = [uploaded_files]
+    name = uploaded_files[0].name if len(uploaded_files) == 1 else f"{len(uploaded_files)} registers"
 
-def upload_premium_summary(premium_file):
+    db_name = st.session_state["db_name"]
+    return submit_job(
+        "register", name, _job_owner(),
+        _ingest_and_invalidate, db_name, ingest_registers,
+        get_mysql_connection(db_name), [f.getvalue() for f in uploaded_files], st.session_state["username"],
+    )
+
+def upload_premium_summary(premium_file, force=False):
+    """Queues a background ingest of the uploaded premium summary and returns its job id."""
     if "db_name" not in st.session_state:
         st.error("🔒 Login required. Please log in again.")
         st.stop()
 
-    try:
-        # 1. Save uploaded file temporarily
-        with open("temp_premium_upload", "wb") as f:
-            f.write(premium_file.getbuffer())
+    db_name = st.session_state["db_name"]
+    return submit_job(
+        "premium", premium_file.name, _job_owner(),
+        _ingest_and_invalidate, db_name, ingest_premium_summary,
+        get_mysql_connection(db_name), premium_file.getvalue(), premium_file.name,
+        st.session_state.username, force=force,
+    )
+
+
+def show_ingest_jobs(premium_file=None):
+    """Progress of this admin's recent uploads.
+
+    While an upload is running only this panel refreshes (a fragment rerun every
+    JOB_POLL_SECONDS); the whole dashboard reruns once, when the uploads finish.
+    """
+    jobs = list_jobs(_job_owner())
+    if not jobs:
+        return
 
-        # 2. Extract data based on file type
-        if premium_file.name.endswith(".pdf"):
-            premium_df = extract_from_pdf("temp_premium_upload")
+    polling = any(is_active(job) for job in jobs)
+    st.fragment(_show_ingest_jobs_panel, run_every=JOB_POLL_SECONDS if polling else None)(premium_file, polling)
+
+
+def _show_ingest_jobs_panel(premium_file, polling):
+    jobs = list_jobs(_job_owner())
+    st.markdown("#### ⏳ Recent Uploads")
+    for job in jobs:
+        label = "📄" if job["kind"] == "register" else "💰"
+        rows = f" | {job['rows']} rows" if job["rows"] is not None else ""
+        timings = ", ".join(f"{phase} {secs:.1f}s" for phase, secs in job["timings"].items())
+
+        if is_active(job):
+            st.progress(job["progress"], text=f"{label} {job['name']}: {job['phase']}{rows}")
+        elif job["status"] == "saved":
+            st.success(f"{label} {job['name']}: {job['message']}")
+        elif job["status"] in ("skipped", "empty"):
+            st.info(f"{label} {job['name']}: {job['message']}")
+        elif job["status"] == "conflict":
+            st.warning(f"⚠️ {job['name']}: {job['message']}")
+            if premium_file is not None and premium_file.name == job["name"]:
+                forced_key = f"forced_{job['id']}"
+                if st.checkbox("☑️ Force overwrite this month", key=f"override_{job['id']}") and not st.session_state.get(forced_key):
+                    st.session_state[forced_key] = True
+                    upload_premium_summary(premium_file, force=True)
+                    st.rerun()
         else:
-            premium_df = extract_from_txt("temp_premium_upload")
-
-        # 3. Clean and prepare data
-        premium_df.rename(columns={"Report Month": "report_month"}, inplace=True)
-        premium_df["agency_code"] = premium_df["Agency Code"].str.strip().str.upper()
-        premium_df["uploaded_by"] = st.session_state.username
-
-        # 4. Connect to correct DO database
-        engine = get_mysql_connection(st.session_state["db_name"])
-        report_month = premium_df["report_month"].iloc[0]
-
-        # 5. Check if data already exists for this month + uploader
-        existing = pd.read_sql(
-            "SELECT * FROM premium_summary WHERE report_month = %s AND uploaded_by = %s",
-            engine,
-            params=(report_month, st.session_state.username)
-        )
-
-        check_cols = ["agency_code", "report_month", "total_premium", "fp_sch_prem", "fy_sch_prem", "uploaded_by"]
-
-        if not existing.empty:
-            # Compare old vs new
-            existing_sorted = existing[check_cols].sort_values(by=check_cols).reset_index(drop=True)
-            new_sorted = premium_df[check_cols].sort_values(by=check_cols).reset_index(drop=True)
-
-            if existing_sorted.equals(new_sorted):
-                # Exact match — overwrite
-                with engine.begin() as conn:
-                    conn.execute(
-                        "DELETE FROM premium_summary WHERE report_month = %s AND uploaded_by = %s",
-                        (report_month, st.session_state.username)
-                    )
-                premium_df[check_cols].to_sql("premium_summary", con=engine, if_exists="append", index=False)
-                st.success(f"♻️ Existing data for {report_month} matched — overwritten.")
-            else:
-                # Conflict — show warning and checkbox
-                st.warning(f"⚠️ Data for {report_month} already exists and does not match. Upload skipped.")
-
-                if st.checkbox(f"☑️ Force overwrite data for {report_month}", key=f"override_{report_month}"):
-                    from sqlalchemy import text
-                    with engine.connect() as conn:
-                        delete_stmt = text("DELETE FROM premium_summary WHERE report_month = :rm AND uploaded_by = :up")
-                        conn.execute(delete_stmt, {"rm": report_month, "up": st.session_state.username})
+            st.error(f"❌ {job['name']}: {job['message']}")
+        if timings:
+            st.caption(f"⏱️ {timings}")
 
-                    premium_df[check_cols].to_sql("premium_summary", con=engine, if_exists="append", index=False)
-                    st.success(f"✅ Data for {report_month} forcibly overwritten.")
-        else:
-            # New data — insert directly
-            premium_df[check_cols].to_sql("premium_summary", con=engine, if_exists="append", index=False)
-            st.success("✅ Premium summary uploaded and saved.")
-            
-    except Exception as e:
-        st.error(f"❌ Failed to process premium file: {e}")
+    if any(is_active(job) for job in jobs):
+        return  # The fragment polls again in JOB_POLL_SECONDS
+    if polling or get_data_version(st.session_state["db_name"]) != st.session_state.get("loaded_data_version"):
+        st.rerun()  # Uploads finished: rerun the dashboard once, to stop polling and show new data
 
 
 # --- Premium Summary Dropdown ---
@@ -134,17 +124,15 @@ def show_premium_summary_dropdown():
         try:
             engine = get_mysql_connection(st.session_state.db_name)
             username = st.session_state.username
-            query = f"SELECT * FROM premium_summary WHERE uploaded_by = '{username}'"
-            df = pd.read_sql(query, engine)
-            
-            if df.empty:
+            months = get_report_months(engine, username)
+
+            if not months:
                 st.info("No premium summary uploaded yet.")
                 return
 
-            unique_months = df["report_month"].dropna().unique()
-            selected_month = st.selectbox("🗓️ Select Report Month", sorted(unique_months, reverse=True))
-            month_df = df[df["report_month"] == selected_month].copy()
-            eligible_premium_sum = month_df["fp_sch_prem"].sum() + month_df["fy_sch_prem"].sum()
+            selected_month = st.selectbox("🗓️ Select Report Month", months)
+            month_df = get_month_summary(engine, username, selected_month)
+            eligible_premium_sum = get_eligible_premium(engine, username, selected_month)
             st.dataframe(month_df, use_container_width=True)
             st.success(f"🧮 Total Eligible Premium for {selected_month}: ₹{eligible_premium_sum:,.2f}")
 
@@ -152,6 +140,23 @@ def show_premium_summary_dropdown():
             st.warning(f"⚠️ Could not load premium summary: {e}")
 
 
+# --- Agent and Financial Year Rollups ---
+def show_summary_rollups(doc_ranges):
+    with st.expander("📊 Agent & Financial Year Summary"):
+        try:
+            by_agent = load_lic_summary("agency_code", doc_ranges=doc_ranges)
+            if by_agent.empty:
+                st.info("No proposals for the selected years.")
+                return
+            st.markdown("**Per Agent**")
+            st.dataframe(by_agent, use_container_width=True, hide_index=True)
+            st.markdown("**Per Financial Year**")
+            by_year = load_lic_summary("fin_year", doc_ranges=doc_ranges).sort_values("fin_year", ascending=False)
+            st.dataframe(by_year, use_container_width=True, hide_index=True)
+        except Exception as e:
+            st.warning(f"⚠️ Could not load summary: {e}")
+
+
 # --- Pending and Approved Users ---
 def show_pending_approvals():
     st.markdown("---")
@@ -247,18 +252,18 @@ def show_user_management():
 
 
 # --- Data Display and Filtering ---
-def show_agent_data(df):
+def show_agent_data(df, search_keys=None, filters=None):
     if df.empty:
         st.warning("No data to display.")
         return
 
-    df = df.copy().reset_index(drop=True)
-    df.insert(0, "S.No.", range(1, len(df) + 1))
-    df["DOC"] = pd.to_datetime(df["DOC"], errors="coerce")
+    # Normalised search key per row, aligned with df (built here if the caller has none cached)
+    if search_keys is None:
+        search_keys = build_search_keys(df)
+    search_keys = search_keys.reset_index(drop=True)
+    df = df.reset_index(drop=True)
 
-    # Ensure DOC is parsed safely
-    df["DOC"] = pd.to_datetime(df["DOC"], errors="coerce")
-    
+    # DOC arrives as datetime64 from load_lic_doc_index
     min_doc, max_doc = df["DOC"].min(), df["DOC"].max()
 
     # Fallback to today's date if invalid
@@ -266,8 +271,12 @@ def show_agent_data(df):
         min_doc = max_doc = datetime.today()
         
     date_range = st.date_input("🗓️ Filter by DOC", value=(min_doc, max_doc), key="date_filter")
-    if isinstance(date_range, tuple) and len(date_range) == 2:
-        df = df[(df["DOC"] >= pd.to_datetime(date_range[0])) & (df["DOC"] <= pd.to_datetime(date_range[1]))]
+    doc_range = date_range if isinstance(date_range, tuple) and len(date_range) == 2 else None
+    if doc_range:
+        # df arrives sorted by DOC (a DocIndex slice), so the range is a searchsorted slice
+        df = doc_slice(df, *doc_range)
+    df = df.copy()
+    df.insert(0, "S.No.", df.index + 1)
 
     plan_options = ["All Plans"] + sorted(df["Plan"].dropna().astype(str).unique().tolist())
     selected_plan = st.selectbox("📋 Filter by Plan", plan_options, key="plan_filter")
@@ -281,14 +290,36 @@ def show_agent_data(df):
 
     search = st.text_input("🔍 Search", key="search_filter")
     if search:
-        df = df[df.apply(lambda row: search.lower() in str(row).lower(), axis=1)]
+        df = df[search_mask(search_keys.loc[df.index], search)]
+
+    # The same selections as SQL filters, for lic_summary and the paged grid
+    sql_filters = None
+    if filters is not None:
+        sql_filters = dict(
+            agency_code=filters.get("agency_code"),
+            doc_ranges=list(filters.get("doc_ranges", [])) + [doc_range],
+            plans=[selected_plan] if selected_plan != "All Plans" else None,
+            modes=[selected_mode] if selected_mode != "All Modes" else None,
+        )
 
-    st.info(f"🔢 Total Proposals: {len(df)} | 🟢 ANANDA: {(df['ANANDA'].str.strip().str.upper() == 'YES').sum()}")
+    # The paged grid searches with the FULLTEXT index (whole words / prefixes), so while
+    # it is on the headline and plan counts use the same search in SQL
+    paged = sql_filters is not None and st.checkbox("📑 Page through proposals", key="admin_paged_grid")
+    if paged:
+        proposals, ananda, plan_count_df = get_headline_counts(df, sql_filters, search=search)
+    else:
+        # From lic_summary unless a search narrows the rows
+        proposals, ananda, plan_count_df = get_headline_counts(df, None if search else sql_filters)
+    st.info(f"🔢 Total Proposals: {proposals} | 🟢 ANANDA: {ananda}")
 
     df["DOC"] = df["DOC"].dt.strftime("%d/%m/%Y")
     
     display_cols = [col for col in DISPLAY_COLUMNS if col in df.columns]
-    st.dataframe(df[display_cols], use_container_width=True)
+    if paged:
+        # Same filters and search, applied in SQL
+        show_policy_grid(DISPLAY_COLUMNS, "admin", search=search or None, **sql_filters)
+    else:
+        st.dataframe(df[display_cols], use_container_width=True)
 
     with io.BytesIO() as buffer:
         df.to_excel(buffer, index=False, engine="openpyxl")
@@ -305,7 +336,6 @@ def show_agent_data(df):
         st.download_button("📅 Download Data", data=final_buffer.getvalue(), file_name="LIC_Data.xlsx")
 
     st.markdown("### 📊 Policy Count by Plan")
-    plan_count_df = get_policy_count_by_plan(df)
     if not plan_count_df.empty:
         st.dataframe(plan_count_df.style.highlight_max(axis=1), use_container_width=True)
 
@@ -316,37 +346,32 @@ def show_agent_data(df):
 # --- Main Dashboard ---
 def admin_dashboard():
     st.title("🧑‍💼 Admin Panel")
+    ensure_session_migrated()
     show_premium_summary_dropdown()
 
-    df = load_lic_data_from_db()
-    df = filter_df_by_selected_year(df, st.session_state.get("selected_year", "All Years"))
-    df = filter_df_by_financial_year(df, st.session_state.get("fin_year", "All Financial Years"))
-    show_agent_data(df)
+    # One DOC-sorted load per tenant (cached in data_cache); the sidebar years are slices of it
+    st.session_state["loaded_data_version"] = get_data_version(st.session_state["db_name"])
+    doc_ranges = get_session_doc_ranges()
+    show_summary_rollups(doc_ranges)
+    doc_index = load_lic_doc_index(columns=LIC_VIEW_COLUMNS)
+    lo, hi = get_session_year_offsets(doc_index, columns=LIC_VIEW_COLUMNS)
+    show_agent_data(doc_index.slice(lo, hi), doc_index.search_keys.iloc[lo:hi], filters={"doc_ranges": doc_ranges})
 
     st.markdown("---")
     st.markdown("### 📤 Upload Files")
     col1, col2 = st.columns(2)
     with col1:
-        uploaded = st.file_uploader("📄 Upload LIC Proposal Register (.txt)", type="txt")
-        if uploaded and not st.session_state.get("data_uploaded", False):
+        uploaded = st.file_uploader("📄 Upload LIC Proposal Registers (.txt)", type="txt", accept_multiple_files=True)
+        # Queue each selection once, however many reruns it survives
+        upload_ids = [f.file_id for f in uploaded]
+        if uploaded and st.session_state.get("lic_upload_ids") != upload_ids:
+            st.session_state["lic_upload_ids"] = upload_ids
             upload_lic_data(uploaded)
-            st.session_state["data_uploaded"] = True
-            st.rerun()
-        if st.session_state.get("data_uploaded", False):
-            st.success("✅ Data uploaded and updated.")
-            st.session_state["data_uploaded"] = False  # Reset the flag
-    
-
 
     with col2:
         premium_file = st.file_uploader("💰 Upload Premium Summary (PDF or TXT)", type=["pdf", "txt"], key="premium_uploader")
-
-        if premium_file and not st.session_state.get("premium_uploaded", False):
+        if premium_file and st.session_state.get("premium_upload_id") != premium_file.file_id:
+            st.session_state["premium_upload_id"] = premium_file.file_id
             upload_premium_summary(premium_file)
-            st.session_state["premium_uploaded"] = True
-            st.rerun()
 
-        # ✅ Show success message once after rerun
-        if st.session_state.get("premium_uploaded", False):
-            st.success("✅ Premium summary uploaded and saved.")
-            st.session_state["premium_uploaded"] = False
+    show_ingest_jobs(premium_file)
@@ -1,5 +1,6 @@
 import mysql.connector
 from db_config import DB_CONFIG
+from migrations import migrate_tenant
 
 
 def create_new_admin(
@@ -32,33 +33,7 @@ def create_new_admin(
     cursor.execute(f"USE {db_name}")
 
     # Step 3: Create required tables in that admin's DB
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS lic_data (
-            `Policy No` VARCHAR(50),
-            `Short Name` VARCHAR(100),
-            `DOC` DATE,
-            `Term` INT,
-            `Plan` VARCHAR(10),
-            `Mode` VARCHAR(20),
-            `Premium` DECIMAL(10,2),
-            `ENACH Date` DATE,
-            `ANANDA` VARCHAR(10),
-            `Agency Code` VARCHAR(20),
-            `Agent Name` VARCHAR(100)
-        )
-    """)
-
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS premium_summary (
-            agency_code VARCHAR(50),
-            report_month VARCHAR(20),
-            total_premium DECIMAL(15,2),
-            fp_sch_prem DECIMAL(15,2),
-            fy_sch_prem DECIMAL(15,2),
-            uploaded_by VARCHAR(50)
-        )
-    """)
+    # (lic_data and premium_summary come from the migrations below)
 
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -74,6 +49,8 @@ def create_new_admin(
     conn.commit()
     conn.close()
 
+    migrate_tenant(db_name)
+
     # Step 4: Save this admin to the central registry in lic_db
     # Connect again to lic_db
     conn = mysql.connector.connect(
@@ -1,27 +1,36 @@
 # agent_app.py
 import streamlit as st
-import pandas as pd
 import io
-from datetime import datetime
 from openpyxl import load_workbook
 from openpyxl.styles import numbers
-from utils import load_lic_data_from_db, filter_df_by_selected_year, filter_df_by_financial_year, get_policy_count_by_plan
+from utils import load_lic_doc_index, get_session_year_offsets, get_session_doc_ranges, get_headline_counts, ensure_session_migrated
+from search import build_search_keys, search_mask
+from policy_grid import show_policy_grid
+from doc_index import doc_slice
 from data_display_column import AGENT_DISPLAY_COLUMNS as DISPLAY_COLUMNS
 
+LIC_VIEW_COLUMNS = [col for col in DISPLAY_COLUMNS if col != "S.No."]
 
-def show_agent_data(df):
+
+def show_agent_data(df, search_keys=None, filters=None):
     if df.empty:
         st.warning("No data to display.")
         return
 
-    df = df.copy().reset_index(drop=True)
-    df.insert(0, "S.No.", range(1, len(df) + 1))
-    df["DOC"] = pd.to_datetime(df["DOC"], errors="coerce")
+    # Normalised search key per row, aligned with df (built here if the caller has none cached)
+    if search_keys is None:
+        search_keys = build_search_keys(df)
+    search_keys = search_keys.reset_index(drop=True)
+    df = df.reset_index(drop=True)
 
     min_doc, max_doc = df["DOC"].min(), df["DOC"].max()
     date_range = st.date_input("🗓️ Filter by DOC", value=(min_doc, max_doc))
-    if isinstance(date_range, tuple) and len(date_range) == 2:
-        df = df[(df["DOC"] >= pd.to_datetime(date_range[0])) & (df["DOC"] <= pd.to_datetime(date_range[1]))]
+    doc_range = date_range if isinstance(date_range, tuple) and len(date_range) == 2 else None
+    if doc_range:
+        # df arrives sorted by DOC (a DocIndex slice), so the range is a searchsorted slice
+        df = doc_slice(df, *doc_range)
+    df = df.copy()
+    df.insert(0, "S.No.", df.index + 1)
 
     plan_options = ["All Plans"] + sorted(df["Plan"].dropna().astype(str).unique().tolist())
     selected_plan = st.selectbox("📋 Filter by Plan", plan_options)
@@ -35,14 +44,36 @@ def show_agent_data(df):
 
     search = st.text_input("🔍 Search")
     if search:
-        df = df[df.apply(lambda row: search.lower() in str(row).lower(), axis=1)]
-
-    st.info(f"🔢 Total Proposals: {len(df)} | 🟢 ANANDA: {(df['ANANDA'].str.strip().str.upper() == 'YES').sum()}")
+        df = df[search_mask(search_keys.loc[df.index], search)]
+
+    # The same selections as SQL filters, for lic_summary and the paged grid
+    sql_filters = None
+    if filters is not None:
+        sql_filters = dict(
+            agency_code=filters.get("agency_code"),
+            doc_ranges=list(filters.get("doc_ranges", [])) + [doc_range],
+            plans=[selected_plan] if selected_plan != "All Plans" else None,
+            modes=[selected_mode] if selected_mode != "All Modes" else None,
+        )
+
+    # The paged grid searches with the FULLTEXT index (whole words / prefixes), so while
+    # it is on the headline and plan counts use the same search in SQL
+    paged = sql_filters is not None and st.checkbox("📑 Page through proposals", key="agent_paged_grid")
+    if paged:
+        proposals, ananda, plan_count_df = get_headline_counts(df, sql_filters, search=search)
+    else:
+        # From lic_summary unless a search narrows the rows
+        proposals, ananda, plan_count_df = get_headline_counts(df, None if search else sql_filters)
+    st.info(f"🔢 Total Proposals: {proposals} | 🟢 ANANDA: {ananda}")
 
     df["DOC"] = df["DOC"].dt.strftime("%d/%m/%Y")
 
     display_cols = [col for col in DISPLAY_COLUMNS if col in df.columns]
-    st.dataframe(df[display_cols], use_container_width=True)
+    if paged:
+        # Same filters and search, applied in SQL
+        show_policy_grid(DISPLAY_COLUMNS, "agent", search=search or None, **sql_filters)
+    else:
+        st.dataframe(df[display_cols], use_container_width=True)
 
     # Excel export
     with io.BytesIO() as buffer:
@@ -60,7 +91,6 @@ def show_agent_data(df):
         st.download_button("📅 Download Data", data=final_buffer.getvalue(), file_name="Agent_Data.xlsx")
 
     st.markdown("### 📊 Policy Count by Plan")
-    plan_count_df = get_policy_count_by_plan(df)
     if not plan_count_df.empty:
         st.dataframe(plan_count_df.style.highlight_max(axis=1), use_container_width=True)
 
@@ -68,19 +98,18 @@ def show_agent_data(df):
 def agent_dashboard():
     st.title("📋 My Agency")
 
-    df = load_lic_data_from_db()
-
     # ✅ Get agency_code from session
     agency_code = st.session_state.get("agency_code")
     if not agency_code:
             st.error("❌ No agency code found for this user.")
             return
-    # ✅ Filter using agency_code
-    df["Agency Code"] = df["Agency Code"].astype(str)
-    df = df[df["Agency Code"].str.strip().str.upper() == agency_code.strip().upper()]
 
-    df = filter_df_by_selected_year(df, st.session_state.get("selected_year", "All Years"))
-    df = filter_df_by_financial_year(df, st.session_state.get("fin_year", "All Financial Years"))
+    ensure_session_migrated()
 
-    show_agent_data(df)
+    # ✅ Agency code and columns are applied in SQL: only this agent's rows are read;
+    # the sidebar years are slices of the DOC-sorted index
+    doc_ranges = get_session_doc_ranges()
+    doc_index = load_lic_doc_index(columns=LIC_VIEW_COLUMNS, agency_code=agency_code)
+    lo, hi = get_session_year_offsets(doc_index, columns=LIC_VIEW_COLUMNS, agency_code=agency_code)
+    show_agent_data(doc_index.slice(lo, hi), doc_index.search_keys.iloc[lo:hi], filters={"agency_code": agency_code, "doc_ranges": doc_ranges})
 
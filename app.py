@@ -21,6 +21,9 @@ if "logged_in" not in st.session_state:
     st.session_state["show_registration_form"] = False
 
 try:
+    from migrations import migrate_on_startup
+    migrate_on_startup()  # Brings every lic_* database to the current schema, once per process
+
     from login_router import route_dashboard
     route_dashboard()
 except Exception as e:
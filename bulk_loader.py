@@ -0,0 +1,118 @@
+# bulk_loader.py
+import csv
+import os
+import tempfile
+import time
+from collections import namedtuple
+import pandas as pd
+from sqlalchemy.exc import DBAPIError
+
+BATCH_SIZE = 5000
+USE_LOAD_DATA = True
+
+# Server/client refusals of LOAD DATA LOCAL: fall back to batched inserts
+LOAD_DATA_DISABLED_ERRNOS = {1148, 2068, 3948}
+_load_data_disabled = False
+
+
+class LoadStats(namedtuple("LoadStats", ["rows", "seconds", "method"])):
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+    def __str__(self):
+        return f"{self.rows} rows in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s via {self.method})"
+
+
+def _quote(column):
+    return f"`{column}`"
+
+
+def db_values(df):
+    """Rows as plain Python tuples: NaN/NaT become NULL, datetimes become dates."""
+    values = df.astype(object)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            values[col] = [d.date() if pd.notna(d) else None for d in df[col]]
+    values = values.where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+def insert_batches(conn, table, df, batch_size=BATCH_SIZE, replace=False):
+    """Multi-row INSERTs of ``batch_size`` rows each (the connector folds executemany into one statement).
+
+    With ``replace``, a row whose key is already in the table replaces it.
+    """
+    columns = ", ".join(_quote(col) for col in df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    statement = f"{'REPLACE' if replace else 'INSERT'} INTO {_quote(table)} ({columns}) VALUES ({placeholders})"
+    for start in range(0, len(df), batch_size):
+        conn.exec_driver_sql(statement, db_values(df.iloc[start:start + batch_size]))
+
+
+def upsert_batches(conn, table, df, key_columns, batch_size=BATCH_SIZE):
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE of every non-key column."""
+    columns = ", ".join(_quote(col) for col in df.columns)
+    placeholders = ", ".join(["%s"] * len(df.columns))
+    updates = ", ".join(f"{_quote(col)} = VALUES({_quote(col)})" for col in df.columns if col not in key_columns)
+    statement = (
+        f"INSERT INTO {_quote(table)} ({columns}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+    started = time.perf_counter()
+    for start in range(0, len(df), batch_size):
+        conn.exec_driver_sql(statement, db_values(df.iloc[start:start + batch_size]))
+    return LoadStats(len(df), time.perf_counter() - started, "upsert")
+
+
+def load_data_infile(conn, table, df, replace=False):
+    """LOAD DATA LOCAL INFILE from a CSV rendering of ``df``.
+
+    The connector only reads LOCAL INFILE from a path, so the CSV is spooled to
+    a private temp file that is removed straight after the load. Rows with a
+    key already in the table are skipped, or replace it with ``replace``.
+    """
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=".csv")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            df.to_csv(
+                f, header=False, index=False, na_rep="NULL", date_format="%Y-%m-%d",
+                quoting=csv.QUOTE_MINIMAL, lineterminator="\n",
+            )
+        columns = ", ".join(_quote(col) for col in df.columns)
+        conn.exec_driver_sql(
+            f"LOAD DATA LOCAL INFILE %s {'REPLACE ' if replace else ''}INTO TABLE {_quote(table)} CHARACTER SET utf8mb4 "
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({columns})",
+            (path,),
+        )
+    finally:
+        os.remove(path)
+
+
+def bulk_insert(conn, table, df, batch_size=BATCH_SIZE, use_load_data=USE_LOAD_DATA, replace=False):
+    """Appends ``df`` to ``table`` as fast as the server allows and returns LoadStats.
+
+    Tries LOAD DATA LOCAL INFILE first; if the server or client has it
+    disabled, remembers that for this process and uses batched INSERTs.
+    ``replace`` makes rows replace those already stored under the same key.
+    """
+    global _load_data_disabled
+    started = time.perf_counter()
+
+    if df.empty:
+        return LoadStats(0, 0.0, "none")
+
+    if use_load_data and not _load_data_disabled:
+        try:
+            load_data_infile(conn, table, df, replace)
+            return LoadStats(len(df), time.perf_counter() - started, "LOAD DATA")
+        except DBAPIError as e:
+            if getattr(e.orig, "errno", None) not in LOAD_DATA_DISABLED_ERRNOS:
+                raise
+            print(f"[BULK LOAD] LOAD DATA LOCAL unavailable, using batched inserts: {e.orig}")
+            _load_data_disabled = True
+            started = time.perf_counter()
+
+    insert_batches(conn, table, df, batch_size, replace)
+    return LoadStats(len(df), time.perf_counter() - started, f"INSERT x{batch_size}")
@@ -0,0 +1,81 @@
+# data_cache.py
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Tenant DataFrames shared by every session of this process, newest data_version only
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+_frames = OrderedDict()  # (db_name, data_version, key) -> (DataFrame, bytes)
+_versions = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def frame_bytes(df):
+    """Deep memory use of a cached DataFrame or Series (shallow size for anything else)."""
+    if not hasattr(df, "memory_usage"):
+        return sys.getsizeof(df)
+    return int(np.sum(df.memory_usage(index=True, deep=True)))
+
+
+def get_data_version(db_name):
+    with _lock:
+        return _versions.get(db_name, 0)
+
+
+def bump_data_version(db_name):
+    """Marks the tenant's data as changed: its cached frames are dropped and the next read reloads."""
+    with _lock:
+        _versions[db_name] = _versions.get(db_name, 0) + 1
+        for cache_key in [k for k in _frames if k[0] == db_name]:
+            del _frames[cache_key]
+        return _versions[db_name]
+
+
+def _evict(max_bytes):
+    total = sum(size for _, size in _frames.values())
+    while _frames and total > max_bytes:
+        _, (_, size) = _frames.popitem(last=False)
+        total -= size
+        _stats["evictions"] += 1
+
+
+def get_or_load(db_name, key, load, max_bytes=None):
+    """Returns the cached frame of ``key`` for the tenant's current data_version, loading it on a miss.
+
+    ``key`` must be hashable and describe the query (filters, columns). The
+    frame is shared between sessions: callers copy it before modifying it.
+    """
+    version = get_data_version(db_name)
+    cache_key = (db_name, version, key)
+    with _lock:
+        entry = _frames.get(cache_key)
+        if entry is not None:
+            _frames.move_to_end(cache_key)
+            _stats["hits"] += 1
+            return entry[0]
+        _stats["misses"] += 1
+
+    # Load outside the lock; two sessions missing together both load, the last one is kept
+    df = load()
+    size = frame_bytes(df)
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        if size <= max_bytes and _versions.get(db_name, 0) == version:
+            _frames[cache_key] = (df, size)
+            _evict(max_bytes)
+    return df
+
+
+def cache_stats():
+    """Hit/miss counters, total bytes and the size of every cached frame, largest first."""
+    with _lock:
+        return dict(
+            _stats,
+            entries=len(_frames),
+            bytes=sum(size for _, size in _frames.values()),
+            frames=sorted(((key, size) for key, (_, size) in _frames.items()), key=lambda item: -item[1]),
+            versions=dict(_versions),
+        )
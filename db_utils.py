@@ -1,31 +1,76 @@
 # db_utils.py
+import threading
+from contextlib import contextmanager
 import mysql.connector
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 import pandas as pd
 import streamlit as st
 from db_config import DB_CONFIG
 
 # === Connection Helper ===
+# Connections to the central lic-db (and any other database asked for here) come
+# from one MySQLConnectionPool per database, shared by every session of this process
+POOL_SIZE = 5
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(db_name):
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            db_config = DB_CONFIG.copy()
+            db_config["database"] = db_name
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"pool_{db_name}"[:64],
+                pool_size=POOL_SIZE,
+                pool_reset_session=True,
+                consume_results=True,  # fetchone() leftovers must not block the connection's reuse
+                **db_config,
+            )
+            _pools[db_name] = pool
+        return pool
+
+
 def get_mysql_connection(db_name=None):
-    db_config = DB_CONFIG.copy()
-    if db_name:
+    """Returns a connection to ``db_name`` (default: the central DB); close() hands it back to the pool.
+
+    When every pooled connection is in use, a plain connection is opened instead
+    of failing the request.
+    """
+    db_name = db_name or DB_CONFIG["database"]
+    try:
+        return _get_pool(db_name).get_connection()
+    except PoolError:
+        db_config = DB_CONFIG.copy()
         db_config["database"] = db_name
-    return mysql.connector.connect(**db_config)
+        return mysql.connector.connect(**db_config)
+
+
+@contextmanager
+def pooled_connection(db_name=None):
+    """``with pooled_connection() as conn:`` checks a connection out and always returns it."""
+    conn = get_mysql_connection(db_name)
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
 
 def get_db_connection():
     if "db_name" not in st.session_state:
         st.error("No database selected. Please log in again.")
         st.stop()
 
-    return mysql.connector.connect(
-        host=HOST,
-        user=USER,
-        password=PASSWORD,
-        database=st.session_state["db_name"]
-    )
+    return get_mysql_connection(st.session_state["db_name"])
 
 # === Initialization ===
 def init_db():
-    with get_mysql_connection("lic-db") as conn:
+    with pooled_connection("lic-db") as conn:
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -65,22 +110,13 @@ def init_db():
         conn.commit()
 
 def check_credentials(username, password):
-    import mysql.connector
-
-    conn = mysql.connector.connect(
-        host=HOST,
-        user=USER,
-        password=PASSWORD,
-        database="lic-db"  # Central DB where all user credentials are stored
-    )
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute(
-        "SELECT * FROM users WHERE username = %s AND password = %s",
-        (username, password)
-    )
-    user = cursor.fetchone()
-    conn.close()
+    with pooled_connection("lic-db") as conn:  # Central DB where all user credentials are stored
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            "SELECT * FROM users WHERE username = %s AND password = %s",
+            (username, password)
+        )
+        user = cursor.fetchone()
 
     if user:
         do_code = user['do_code']  # Ensure this column exists in your users table
@@ -93,13 +129,13 @@ def check_credentials(username, password):
         return False
 
 def user_exists(username):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM users WHERE username = %s", (username.upper(),))
         return cursor.fetchone() is not None
 
 def get_admin_by_do_code(do_code):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM users WHERE role = 'admin' AND do_code = %s", (do_code,))
         return cursor.fetchone()
@@ -107,13 +143,13 @@ def get_admin_by_do_code(do_code):
 
 # === Users Management ===
 def get_user(username):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor(dictionary=True)
         cursor.execute("SELECT * FROM users WHERE username = %s", (username.upper(),))
         return cursor.fetchone()
 
 def add_user(username, password, role, start_date=None, admin_username=None, db_name=None, do_code=None, agency_code = None, name = None):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO users (username, password, role, start_date, admin_username, db_name, do_code, agency_code, name)
@@ -122,14 +158,14 @@ def add_user(username, password, role, start_date=None, admin_username=None, db_
         conn.commit()
 
 def delete_user(username):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM users WHERE username = %s", (username.upper(),))
         conn.commit()
 
 # === Pending Registration ===
-def add_pending_user(username, password, role, admin_username, db_name, do_code = None, agency_code = None, name):
-    with get_mysql_connection() as conn:
+def add_pending_user(username, password, role, admin_username, db_name, do_code = None, agency_code = None, name = None):
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO pending_users (username, password, role, admin_username, db_name, do_code, agency_code, name)
@@ -138,20 +174,20 @@ def add_pending_user(username, password, role, admin_username, db_name, do_code
         conn.commit()
 
 def get_pending_users():
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT id, username, password, role, admin_username, db_name, do_code, agency_code, name FROM pending_users")
         return cursor.fetchall()
 
 def delete_pending_user(rowid):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM pending_users WHERE id = %s", (rowid,))
         conn.commit()
 
 # === Login Tracking ===
 def log_failed_attempt(username):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM failed_attempts WHERE username = %s", (username.upper(),))
         if cursor.fetchone():
@@ -161,23 +197,23 @@ def log_failed_attempt(username):
         conn.commit()
 
 def reset_failed_attempts(username):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("DELETE FROM failed_attempts WHERE username = %s", (username.upper(),))
         conn.commit()
 
 # === Utilities ===
 def load_users():
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         return pd.read_sql("SELECT * FROM users", conn)
 
 def get_all_users():
-    with get_mysql_connection() as conn:
-        df = pd.read_sql("SELECT username, role, start_date, do_code, namen agency_code FROM users", conn)
+    with pooled_connection() as conn:
+        df = pd.read_sql("SELECT username, role, start_date, do_code FROM users", conn)
         return df.values.tolist()
 
 def update_user_role_and_start(username, new_role, new_start_date):
-    with get_mysql_connection() as conn:
+    with pooled_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             UPDATE users
@@ -0,0 +1,72 @@
+# doc_index.py
+import numpy as np
+import pandas as pd
+from search import build_search_keys
+
+
+class DocIndex:
+    """A lic_data frame sorted by DOC (undated rows last) with O(log n) DOC range slicing.
+
+    Slices are positional ``iloc`` ranges of the sorted frame, so no boolean
+    mask is built and no rows are copied; treat the frame and its slices as
+    read-only, since they are shared through data_cache. With ``search=True``
+    the search keys are built from the sorted frame and kept beside it, so
+    ``search_keys.iloc[lo:hi]`` always lines up with ``slice(lo, hi)``.
+    """
+
+    def __init__(self, df, search=False):
+        if "DOC" in df.columns:
+            df = df.sort_values("DOC", kind="stable", na_position="last")
+            self.dated = int(df["DOC"].notna().sum())
+            self.docs = df["DOC"].to_numpy()[:self.dated]
+        else:
+            self.dated, self.docs = 0, np.array([], dtype="datetime64[ns]")
+        self.frame = df.reset_index(drop=True)
+        self.search_keys = build_search_keys(self.frame) if search else None
+
+    def __len__(self):
+        return len(self.frame)
+
+    def memory_usage(self, index=True, deep=False):
+        total = self.frame.memory_usage(index=index, deep=deep).sum() + self.docs.nbytes
+        if self.search_keys is not None:
+            total += self.search_keys.memory_usage(index=index, deep=deep)
+        return total
+
+    def offsets(self, start, end):
+        """(lo, hi) positions of the rows with start <= DOC <= end; None bounds are open."""
+        lo = 0 if start is None else int(np.searchsorted(self.docs, np.datetime64(pd.Timestamp(start)), side="left"))
+        hi = self.dated if end is None else int(np.searchsorted(self.docs, np.datetime64(pd.Timestamp(end)), side="right"))
+        return lo, max(lo, hi)
+
+    def boundary_offsets(self, ranges):
+        """{label: (lo, hi)} for {label: (start, end) or None}; None means every row, undated included."""
+        labels = [label for label, r in ranges.items() if r]
+        starts = np.array([np.datetime64(pd.Timestamp(ranges[label][0])) for label in labels], dtype="datetime64[ns]")
+        ends = np.array([np.datetime64(pd.Timestamp(ranges[label][1])) for label in labels], dtype="datetime64[ns]")
+        los = np.searchsorted(self.docs, starts, side="left")
+        his = np.searchsorted(self.docs, ends, side="right")
+        offsets = {label: (0, len(self.frame)) for label, r in ranges.items() if not r}
+        offsets.update({label: (int(lo), int(max(lo, hi))) for label, lo, hi in zip(labels, los, his)})
+        return offsets
+
+    def slice(self, lo, hi):
+        return self.frame.iloc[lo:hi]
+
+    def between(self, start, end):
+        return self.slice(*self.offsets(start, end))
+
+
+def doc_slice(df, start, end):
+    """Rows of a DOC-sorted frame (undated last, e.g. a DocIndex slice) with start <= DOC <= end."""
+    docs = df["DOC"].to_numpy()
+    lo = int(np.searchsorted(docs, np.datetime64(pd.Timestamp(start)), side="left"))
+    hi = int(np.searchsorted(docs, np.datetime64(pd.Timestamp(end)), side="right"))
+    return df.iloc[lo:max(lo, hi)]
+
+
+def intersect_offsets(*offsets):
+    """The overlap of several (lo, hi) ranges."""
+    lo = max(o[0] for o in offsets)
+    hi = min(o[1] for o in offsets)
+    return lo, max(lo, hi)
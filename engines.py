@@ -0,0 +1,90 @@
+# engines.py
+import threading
+from collections import OrderedDict
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from db_config import DB_CONFIG
+
+# One pooled engine per tenant database, shared by every session and job of this process
+POOL_SIZE = 5
+MAX_OVERFLOW = 5
+POOL_TIMEOUT = 30
+POOL_RECYCLE = 1800  # seconds; stays below RDS/MySQL wait_timeout
+POOL_PRE_PING = True
+MAX_ENGINES = 32  # least recently used tenant engines beyond this are disposed
+CONNECT_ARGS = {"allow_local_infile": True}  # Bulk loads use LOAD DATA LOCAL INFILE
+
+_engines = OrderedDict()
+_lock = threading.Lock()
+
+
+def _engine_url(db_name):
+    return (
+        f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}"
+        f"@{DB_CONFIG['host']}:{DB_CONFIG.get('port', 3306)}/{db_name}"
+    )
+
+
+def get_engine(db_name=None):
+    """Returns the process-wide pooled engine of ``db_name``, creating it on first use."""
+    if db_name is None:
+        db_name = DB_CONFIG["database"]
+
+    with _lock:
+        engine = _engines.get(db_name)
+        if engine is not None:
+            _engines.move_to_end(db_name)
+            return engine
+
+        engine = create_engine(
+            _engine_url(db_name),
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+            pool_pre_ping=POOL_PRE_PING,
+            connect_args=CONNECT_ARGS,
+        )
+        _engines[db_name] = engine
+        evicted = []
+        while len(_engines) > MAX_ENGINES:
+            evicted.append(_engines.popitem(last=False)[1])
+
+    # Idle connections close now; connections still checked out are discarded when returned
+    for old in evicted:
+        old.dispose()
+    return engine
+
+
+def create_unpooled_engine(db_name=None):
+    """A throwaway engine outside the registry, for one-off work such as migrating every tenant."""
+    return create_engine(
+        _engine_url(db_name or DB_CONFIG["database"]),
+        poolclass=NullPool,
+        pool_pre_ping=False,
+        connect_args=CONNECT_ARGS,
+    )
+
+
+def dispose_engine(db_name):
+    """Drops the engine of ``db_name`` (e.g. after the tenant database is removed)."""
+    with _lock:
+        engine = _engines.pop(db_name, None)
+    if engine is not None:
+        engine.dispose()
+
+
+def pool_stats():
+    """{db_name: pool counters} of every open engine, least recently used first."""
+    with _lock:
+        engines = list(_engines.items())
+    return {
+        db_name: {
+            "size": engine.pool.size(),
+            "checked_in": engine.pool.checkedin(),
+            "checked_out": engine.pool.checkedout(),
+            "overflow": engine.pool.overflow(),
+            "status": engine.pool.status(),
+        }
+        for db_name, engine in engines
+    }
@@ -1,24 +1,160 @@
+import argparse
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
+from extractor import process_pool_context
 
 # --- For TXT files ---
-def extract_from_txt(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        text = f.read()
+def extract_from_txt(source):
+    """Accepts a file path or the uploaded bytes."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        text = bytes(source).decode("utf-8")
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            text = f.read()
     return parse_summary_text(text)
 
 # --- For PDF files ---
-def extract_from_pdf(file_path):
+PDF_PARALLEL_MIN_PAGES = 40
+PAGES_PER_WORKER = 4
+
+
+def _open_pdf(source):
     import fitz  # PyMuPDF
-    text = ""
-    with fitz.open(file_path) as doc:
-        for page in doc:
-            text += page.get_text()
-    return parse_summary_text(text)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=bytes(source), filetype="pdf")
+    return fitz.open(source)
+
+
+_worker_pdf = None  # The PDF each pool worker opened in _open_worker_pdf
+
+
+def _open_worker_pdf(source):
+    """Process-pool initializer: opens the PDF once per worker, not once per task."""
+    global _worker_pdf
+    _worker_pdf = _open_pdf(source)
+
+
+def _page_range_text(start, stop):
+    """Process-pool worker: text of pages [start, stop) of the worker's PDF."""
+    return [_worker_pdf[i].get_text() for i in range(start, stop)]
+
+
+def extract_pdf_pages(source, max_workers=None):
+    """Returns the text of every page, in page order.
+
+    Long PDFs are split into page ranges that are read on a process pool.
+    """
+    with _open_pdf(source) as doc:
+        n_pages = doc.page_count
+        max_workers = min(max_workers or os.cpu_count() or 1, n_pages or 1)
+        if max_workers <= 1 or n_pages < PDF_PARALLEL_MIN_PAGES:
+            return [page.get_text() for page in doc]
+
+    if isinstance(source, memoryview):
+        source = bytes(source)
+    step = max(1, -(-n_pages // (max_workers * PAGES_PER_WORKER)))
+    starts = list(range(0, n_pages, step))
+    stops = [min(start + step, n_pages) for start in starts]
+    # The PDF is sent to each worker once; tasks carry only their page range
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context(),
+                             initializer=_open_worker_pdf, initargs=(source,)) as pool:
+        chunks = pool.map(_page_range_text, starts, stops)
+        return [text for chunk in chunks for text in chunk]
+
+
+def extract_from_pdf(source, max_workers=None):
+    """Accepts a file path or the uploaded bytes (opened in memory)."""
+    return parse_summary_chunks(extract_pdf_pages(source, max_workers))
+
+
+def benchmark_pdf_extraction(source, rounds=3):
+    """Times the old page-by-page ``text +=`` loop against extract_pdf_pages."""
+    def concat_loop():
+        text = ""
+        with _open_pdf(source) as doc:
+            for page in doc:
+                text += page.get_text()
+        return text
+
+    timings = {}
+    for label, run in (("serial +=", concat_loop),
+                       ("pages x1", lambda: "".join(extract_pdf_pages(source, max_workers=1))),
+                       ("pages parallel", lambda: "".join(extract_pdf_pages(source)))):
+        best = float("inf")
+        for _ in range(rounds):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        timings[label] = best
+    return timings
 
 # --- Shared logic ---
+SUMMARY_COLUMNS = ["Agency Code", "total_premium", "fp_sch_prem", "fy_sch_prem", "Report Month"]
+
+# One alternation, scanned left to right: no lazy gaps, so no backtracking across blocks.
+# The lookahead lets the scanner skip every position that cannot start a token.
+SUMMARY_TOKENS = re.compile(
+    r"(?=[FTP])(?:"
+    r"FOR THE MONTH OF\s+(?P<month>\d{2}/\d{4})"
+    r"|TOTAL FOR AGENT\s*:\s*(?P<agent>\w+)"
+    r"|FP Sch\.Prem\s*:\s*(?P<fp>[\d.]+)"
+    r"|FY Sch\.Prem\s*:\s*(?P<fy>[\d.]+)"
+    r"|PREMIUM\s*:\s*(?P<premium>[\d.]+))",
+    re.IGNORECASE,
+)
+
+
+def parse_summary_chunks(chunks):
+    """Block-by-block state machine over the summary text, fed in chunks (pages or lines).
+
+    Every "TOTAL FOR AGENT" opens a block that takes the first PREMIUM,
+    FP Sch.Prem and FY Sch.Prem after it; the next block closes it, so fields
+    are never paired across agents. Each row gets the "FOR THE MONTH OF"
+    heading in effect where its block starts.
+    """
+    agents, premiums, fp_prems, fy_prems, months = [], [], [], [], []
+    month, first_month = None, None
+
+    for chunk in chunks:
+        for token_month, agent, fp, fy, premium in SUMMARY_TOKENS.findall(chunk):
+            if agent:
+                agents.append(agent)
+                premiums.append(None)
+                fp_prems.append(None)
+                fy_prems.append(None)
+                months.append(month)
+            elif token_month:
+                month = token_month
+                first_month = first_month or token_month
+            elif agents:
+                # First value after the block's header wins
+                if premium and premiums[-1] is None:
+                    premiums[-1] = premium
+                elif fp and fp_prems[-1] is None:
+                    fp_prems[-1] = fp
+                elif fy and fy_prems[-1] is None:
+                    fy_prems[-1] = fy
+
+    df = pd.DataFrame({
+        "Agency Code": pd.Series(agents, dtype=object).str.strip().str.upper(),
+        "total_premium": premiums,
+        "fp_sch_prem": fp_prems,
+        "fy_sch_prem": fy_prems,
+        # Blocks printed before the first heading take the document's month
+        "Report Month": [m or first_month or "Unknown" for m in months],
+    }, columns=SUMMARY_COLUMNS)
+    return df
+
+
 def parse_summary_text(text):
-    # Extract month from heading
+    return parse_summary_chunks([text])
+
+
+def _legacy_parse_summary_text(text):
+    """parse_summary_text as it was before the block parser, kept for benchmarking only."""
     month_match = re.search(r"FOR THE MONTH OF (\d{2}/\d{4})", text)
     report_month = month_match.group(1) if month_match else "Unknown"
 
@@ -30,6 +166,63 @@ def parse_summary_text(text):
 
     df = pd.DataFrame(data, columns=["Agency Code", "total_premium", "fp_sch_prem", "fy_sch_prem"])
     df["Agency Code"] = df["Agency Code"].str.strip().str.upper()
-    df["Report Month"] = report_month  # ✅ Add the month as new column
+    df["Report Month"] = report_month
     return df
 
+
+def _synthetic_summary(n_agents, months=("03/2025",), missing_fy_from=None):
+    """One line per agent block, the layout the legacy regex can parse.
+
+    Blocks from index ``missing_fy_from`` on have no FY Sch.Prem.
+    """
+    blocks = []
+    for month in months:
+        blocks.append(f"AGENT WISE PREMIUM SUMMARY FOR THE MONTH OF {month}\n")
+        for i in range(n_agents):
+            fy = "" if missing_fy_from is not None and i >= missing_fy_from else f"   FY Sch.Prem : {i % 89}.00"
+            blocks.append(
+                f"TOTAL FOR AGENT : {i:07d}C   NOP : 3   PREMIUM : {1000 + i}.00   FP Sch.Prem : {i % 97}.00{fy}\n"
+            )
+    return "".join(blocks)
+
+
+def benchmark_summary_parser(n_agents=10_000, rounds=3):
+    """Rows found and best time of parse_summary_text and the legacy regex on n-agent summaries.
+
+    Both run on the same single-line blocks, well formed and with the second
+    half of the blocks missing FY Sch.Prem.
+    """
+    inputs = (
+        ("well formed", _synthetic_summary(n_agents)),
+        ("half missing FY", _synthetic_summary(n_agents, missing_fy_from=n_agents // 2)),
+    )
+
+    timings = {}
+    for input_label, text in inputs:
+        for parser_label, run in (("block parser", lambda: len(parse_summary_text(text))),
+                                  ("legacy regex", lambda: len(_legacy_parse_summary_text(text)))):
+            best = float("inf")
+            for _ in range(rounds):
+                started = time.perf_counter()
+                rows = run()
+                best = min(best, time.perf_counter() - started)
+            timings[f"{parser_label}, {input_label}"] = (best, rows)
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark premium summary PDF extraction or the summary parser.")
+    parser.add_argument("pdf", nargs="?", help="summary PDF to time text extraction on")
+    parser.add_argument("--parser", metavar="N_AGENTS", type=int, nargs="?", const=10_000,
+                        help="time parse_summary_text on a synthetic N_AGENTS summary instead (default 10000)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.parser is not None:
+        for label, (seconds, rows) in benchmark_summary_parser(args.parser, args.rounds).items():
+            print(f"{label:>30}: {seconds * 1000:8.1f} ms  ({rows:,} rows)")
+    elif args.pdf:
+        for label, seconds in benchmark_pdf_extraction(args.pdf, args.rounds).items():
+            print(f"{label:>15}: {seconds * 1000:8.1f} ms")
+    else:
+        parser.error("give a summary PDF or --parser")
@@ -1,111 +1,405 @@
+import hashlib
+import io
+import multiprocessing
+import os
 import pandas as pd
-from datetime import datetime
-
-def format_date(date_str):
-    """Converts date from YYYYMMDD to DD/MM/YYYY format."""
-    try:
-        if date_str and len(date_str) == 8 and date_str.isdigit():
-            return datetime.strptime(date_str, "%Y%m%d").strftime("%d/%m/%Y")
-        return date_str
-    except Exception:
-        return date_str
-
-def get_enach_date(doc_str, mode_str):
-    """Determines ENACH debit date based on DOC and mode."""
-    try:
-        if not doc_str or not mode_str or mode_str.strip().lower() not in ["m", "mly", "monthly", "month", "monthly mode"]:
-            return ""
-
-        doc = datetime.strptime(doc_str, "%d/%m/%Y")
-        day = doc.day
-
-        if 1 <= day <= 7:
-            return "7"
-        elif 8 <= day <= 15:
-            return "15"
-        elif 16 <= day <= 22:
-            return "22"
-        elif 23 <= day <= 31:
-            return "28"
-        return ""
-    except Exception as e:
-        print(f"[ENACH ERROR] DOC: {doc_str}, Mode: {mode_str}, Error: {e}")
-        return ""
-
-def extract_all_lic_data(file_path):
-    """Parses LIC text file and extracts relevant policy data into a DataFrame."""
-    data = []
-
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    i = 0
-    current_agent_name = ""
-    current_agency_code = ""
-
-    while i < len(lines):
-        line = lines[i].strip()
-
-        # Capture agent name
-        if "Name of the agent" in line:
-            current_agent_name = line.split("Name of the agent")[-1].strip().lstrip(":").strip()
-
-        # Capture agency code
-        elif "Agency Code No." in line:
-            parts = line.split(":")
-            if len(parts) > 1:
-                current_agency_code = parts[1].strip()
+import numpy as np
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
-        parts = line.split('|')
+ENACH_MODES = ["m", "mly", "monthly", "month", "monthly mode"]
+
+
+@contextmanager
+def open_register(source):
+    """Opens a register given as a file path, uploaded bytes/memoryview, or a text stream.
+
+    Uploads are read straight from memory, so no temp file is written.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with io.TextIOWrapper(io.BytesIO(source), encoding="utf-8") as file:
+            yield file
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as file:
+            yield file
+    else:
+        source.seek(0)  # Streams are read more than once (layout, then entries)
+        yield source
+
+
+def _source_size(source):
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, memoryview):
+        return source.nbytes
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    return 0  # Unknown stream size: stay serial
+
+
+LIC_DATA_COLUMNS = [
+    "Agent Name", "Agency Code", "Date of Proposal", "Proposal No", "Short Name",
+    "Policy No", "Date of Completion", "DOC", "Plan", "Term", "Mode", "Premium",
+    "Remarks", "ANANDA", "ENACH Date",
+]
+
+# Stored and served as datetime64, never as formatted strings
+LIC_DATE_COLUMNS = ["Date of Proposal", "Date of Completion", "DOC"]
+
+
+def normalize_lic_dates(df):
+    """Converts the lic_data date columns to datetime64 in place (once, at load time).
+
+    DATE/DATETIME values and ISO text parse as they are; only what is left (rows
+    written before dates were stored typed, which hold DD/MM/YYYY text) is read
+    day-first, so an ISO "2023-09-08" never has its day and month swapped.
+    """
+    for col in LIC_DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            parsed = pd.to_datetime(df[col], format="ISO8601", errors="coerce")
+            day_first = pd.to_datetime(df[col].where(parsed.isna()), format="%d/%m/%Y", errors="coerce")
+            df[col] = parsed.fillna(day_first)
+    return df
+
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Where each field sits in a register entry: (line, field index after split('|')).
+# Line 0 is the proposal line, line 1 the continuation line printed under it.
+REGISTER_LAYOUT = {
+    "Date of Proposal": (0, 0),
+    "Proposal No": (0, 1),
+    "Short Name": (0, 2),
+    "Date of Completion": (0, 5),
+    "Policy No": (0, 6),
+    "Plan": (0, 9),
+    "Mode": (0, 10),
+    "Premium": (0, 11),
+    "Remarks": (0, 12),
+    "DOC": (1, 6),
+    "Term": (1, 9),
+}
+
+HEADER_SCAN_LINES = 200
+
+
+def compile_register_layout(header_lines):
+    """Derives the field positions from the register's column header block.
+
+    The header prints one label row per line of an entry ("Date of |Proposal|..."
+    and "proposal|...|DOC|...|Term|"). Anything not found keeps its default.
+    """
+    layout = dict(REGISTER_LAYOUT)
+    for line in header_lines:
+        labels = [label.strip() for label in line.strip().split("|")]
+
+        if "Policy No" in labels and "Short Name" in labels:
+            date_cols = [idx for idx, label in enumerate(labels) if label == "Date of"]
+            if len(date_cols) >= 2:
+                layout["Date of Proposal"] = (0, date_cols[0])
+                layout["Date of Completion"] = (0, date_cols[1])
+            for field, label in (("Proposal No", "Proposal"), ("Short Name", "Short Name"),
+                                 ("Policy No", "Policy No"), ("Plan", "Plan"), ("Mode", "Mode"),
+                                 ("Premium", "Premium"), ("Remarks", "Remarks")):
+                if label in labels:
+                    layout[field] = (0, labels.index(label))
+
+        elif "DOC" in labels and "Term" in labels:
+            layout["DOC"] = (1, labels.index("DOC"))
+            layout["Term"] = (1, labels.index("Term"))
+
+    return layout
 
+
+def read_register_layout(source):
+    """Compiles the layout from the header block on the first page of the register."""
+    with open_register(source) as file:
+        return compile_register_layout(islice(file, HEADER_SCAN_LINES))
+
+
+def _update_agent_context(line, agent_name, agency_code):
+    """Returns the (agent name, agency code) in effect after a stripped header line."""
+    # Capture agent name
+    if "Name of the agent" in line:
+        agent_name = line.split("Name of the agent")[-1].strip().lstrip(":").strip()
+
+    # Capture agency code
+    elif "Agency Code No." in line:
+        parts = line.split(":")
+        if len(parts) > 1:
+            agency_code = parts[1].strip()
+
+    return agent_name, agency_code
+
+
+def _scan_entries(lines, agent_name="", agency_code="", start=0):
+    """Yields (line no, agent name, agency code, record line, continuation line).
+
+    Works on any iterable of lines; only the current record line is held back
+    while waiting for its continuation line, so memory stays flat whatever the
+    size of the register.
+    """
+    pending = None  # (line number, record line) waiting for its second line
+
+    for i, raw_line in enumerate(lines, start):
+        line = raw_line.strip()
+
+        if pending is not None:
+            yield pending[0], agent_name, agency_code, pending[1], line
+            pending = None
+            continue  # Continuation line is consumed with its record
+
+        agent_name, agency_code = _update_agent_context(line, agent_name, agency_code)
+
+        parts = line.split('|')
         if len(parts) > 6 and parts[1].strip().isdigit():
-            try:
-                next_line = lines[i + 1].strip().split('|') if i + 1 < len(lines) else []
-
-                # Extract fields from main line
-                proposal_date = format_date(parts[0].strip())
-                proposal_no = parts[1].strip().lstrip("0")
-                short_name = parts[2].strip()
-                date_of_completion = format_date(parts[5].strip())
-                policy_no = parts[6].strip()
-                plan = parts[9].strip() if len(parts) > 9 else ""
-                mode = parts[10].strip() if len(parts) > 10 else ""
-                premium = parts[11].strip() if len(parts) > 11 else ""
-                remarks = parts[12].strip() if len(parts) > 12 else ""
-
-                # Extract from next line
-                doc = format_date(next_line[6].strip()) if len(next_line) > 6 else ""
-                term = next_line[9].strip() if len(next_line) > 9 else ""
-
-                ananda = "YES" if proposal_no.isdigit() and len(proposal_no) == 6 else ""
-                enach_date = get_enach_date(doc, mode)
-
-                data.append({
-                    "Agent Name": current_agent_name,
-                    "Agency Code": current_agency_code,
-                    "Date of Proposal": proposal_date,
-                    "Proposal No": proposal_no,
-                    "Short Name": short_name,
-                    "Policy No": policy_no,
-                    "Date of Completion": date_of_completion,
-                    "DOC": doc,
-                    "Plan": plan,
-                    "Term": term,
-                    "Mode": mode,
-                    "Premium": premium,
-                    "Remarks": remarks,
-                    "ANANDA": ananda,
-                    "ENACH Date": enach_date,
-                })
-
-            except Exception as e:
-                print(f"[ERROR] Failed to parse line {i}: {e}")
-
-            i += 2  # Skip next line since it’s already processed
-        else:
-            i += 1  # Continue to next line
-
-    # Create DataFrame and remove rows without valid Policy No
-    df = pd.DataFrame(data)
-    df = df[df["Policy No"].astype(str).str.strip() != ""]
+            pending = (i, line)
+
+    if pending is not None:
+        yield pending[0], agent_name, agency_code, pending[1], ""
+
+
+def parse_date_column(dates):
+    """Parses YYYYMMDD register date strings to datetime64, anything else to NaT."""
+    dates = dates.fillna("")
+    return pd.to_datetime(dates.where(dates.str.fullmatch(r"\d{8}")), format="%Y%m%d", errors="coerce")
+
+
+def enach_date_column(doc, mode):
+    """ENACH debit day bucket ("7"/"15"/"22"/"28", or "" if not monthly) per DOC of a datetime64 DOC column and a Mode column."""
+    day = doc.dt.day
+    monthly = mode.fillna("").str.strip().str.lower().isin(ENACH_MODES) & doc.notna()
+    buckets = np.select([day <= 7, day <= 15, day <= 22, day <= 31], ["7", "15", "22", "28"], "")
+    return pd.Series(np.where(monthly, buckets, ""), index=doc.index, dtype=object)
+
+
+def _split_column(split_lines, idx):
+    if idx < split_lines.shape[1]:
+        return split_lines[idx].fillna("").str.strip()
+    return pd.Series("", index=split_lines.index, dtype=object)
+
+
+def _build_frame(agent_names, agency_codes, lines, next_lines, layout=REGISTER_LAYOUT):
+    """Fills the lic_data columns straight from a batch of raw entry lines."""
+    split_lines = (
+        pd.Series(lines, dtype=object).str.split("|", expand=True),
+        pd.Series(next_lines, dtype=object).str.split("|", expand=True),
+    )
+    fields = {name: _split_column(split_lines[line], idx) for name, (line, idx) in layout.items()}
+
+    proposal_no = fields["Proposal No"].str.lstrip("0")
+    doc = parse_date_column(fields["DOC"])
+    mode = fields["Mode"]
+
+    df = pd.DataFrame({
+        "Agent Name": pd.Series(agent_names, dtype=object),
+        "Agency Code": pd.Series(agency_codes, dtype=object),
+        "Date of Proposal": parse_date_column(fields["Date of Proposal"]),
+        "Proposal No": proposal_no,
+        "Short Name": fields["Short Name"],
+        "Policy No": fields["Policy No"],
+        "Date of Completion": parse_date_column(fields["Date of Completion"]),
+        "DOC": doc,
+        "Plan": fields["Plan"],
+        "Term": fields["Term"],
+        "Mode": mode,
+        "Premium": fields["Premium"],
+        "Remarks": fields["Remarks"],
+        "ANANDA": np.where(proposal_no.str.fullmatch(r"\d{6}"), "YES", ""),
+        "ENACH Date": enach_date_column(doc, mode),
+    }, columns=LIC_DATA_COLUMNS)
+
+    # Remove rows without valid Policy No
+    return df[df["Policy No"] != ""].reset_index(drop=True)
+
+
+def _collect_frames(entries, layout, chunk_size=DEFAULT_CHUNK_SIZE):
+    batch = ([], [], [], [])
+    for _, agent_name, agency_code, line, next_line in entries:
+        for column, value in zip(batch, (agent_name, agency_code, line, next_line)):
+            column.append(value)
+        if len(batch[0]) >= chunk_size:
+            yield _build_frame(*batch, layout=layout)
+            batch = ([], [], [], [])
+    if batch[0]:
+        yield _build_frame(*batch, layout=layout)
+
+
+def iter_lic_data_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE, agency_codes=None):
+    """Yields the register as DataFrames of at most ``chunk_size`` entries, in file order.
+
+    The register is read line by line and only one chunk of raw entry lines is
+    held at a time, so a caller that writes each chunk out (see
+    ingest.upsert_lic_data) never holds the whole register. ``agency_codes``
+    keeps only those agents' entries.
+    """
+    layout = read_register_layout(source)
+    with open_register(source) as file:
+        entries = _scan_entries(file)
+        if agency_codes is not None:
+            entries = (entry for entry in entries if entry[2] in agency_codes)
+        yield from _collect_frames(entries, layout, chunk_size)
+
+
+# --- Parallel parsing ---
+RegisterSection = namedtuple("RegisterSection", ["start_line", "agent_name", "agency_code", "lines"])
+
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+PARALLEL_MIN_LINES = 30_000
+SECTIONS_PER_WORKER = 4
+
+
+def split_register_sections(source):
+    """Splits the register at every "Name of the agent" header.
+
+    Each section carries the agent name and agency code in effect where it
+    starts, so it can be parsed on its own with the same result as a serial pass.
+    """
+    sections = []
+    agent_name, agency_code = "", ""
+    start, context, current = 0, ("", ""), []
+
+    with open_register(source) as file:
+        for i, raw_line in enumerate(file):
+            line = raw_line.strip()
+            if "Name of the agent" in line and current:
+                sections.append(RegisterSection(start, *context, current))
+                start, context, current = i, (agent_name, agency_code), []
+            current.append(line)
+            agent_name, agency_code = _update_agent_context(line, agent_name, agency_code)
+
+    if current:
+        sections.append(RegisterSection(start, *context, current))
+    return sections
+
+
+def process_pool_context():
+    """Start method for the parsing pools: forkserver where available, else spawn.
+
+    Streamlit runs sessions on threads, and forking a threaded process can copy
+    a held lock into the worker; both methods start workers from a clean process.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _batch_sections(sections, n_batches):
+    """Groups consecutive sections into about ``n_batches`` runs of similar line count."""
+    total = sum(len(section.lines) for section in sections)
+    target = max(1, total // max(1, n_batches))
+    batches, current, size = [], [], 0
+    for section in sections:
+        current.append(section)
+        size += len(section.lines)
+        if size >= target:
+            batches.append(current)
+            current, size = [], 0
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _empty_lic_frame():
+    df = pd.DataFrame(columns=LIC_DATA_COLUMNS)
+    df[LIC_DATE_COLUMNS] = df[LIC_DATE_COLUMNS].astype("datetime64[ns]")
     return df
+
+
+def _parse_sections(sections, layout):
+    """Process-pool worker: parses a run of consecutive sections into one DataFrame."""
+    entries = (
+        entry
+        for section in sections
+        for entry in _scan_entries(section.lines, section.agent_name, section.agency_code, section.start_line)
+    )
+    frames = list(_collect_frames(entries, layout))
+    if not frames:
+        return _empty_lic_frame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def parse_register_sections(sections, layout=REGISTER_LAYOUT, max_workers=None):
+    """Parses register sections into one DataFrame, in section order.
+
+    Runs on a process pool when there is enough work for more than one core.
+    """
+    return parse_section_groups([(sections, layout)], max_workers)
+
+
+def parse_section_groups(groups, max_workers=None):
+    """Parses several registers' sections at once, e.g. a multi-file upload.
+
+    ``groups`` is a list of (sections, layout), one per register. All of them
+    share one process pool and the result keeps group order, then section order.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    total_lines = sum(len(section.lines) for sections, _ in groups for section in sections)
+    n_sections = sum(len(sections) for sections, _ in groups)
+    if max_workers <= 1 or n_sections < 2 or total_lines < PARALLEL_MIN_LINES:
+        frames = [_parse_sections(sections, layout) for sections, layout in groups]
+        return pd.concat(frames, ignore_index=True) if frames else _empty_lic_frame()
+
+    batches, layouts = [], []
+    for sections, layout in groups:
+        # Each register gets a share of the batches in line with its size
+        share = max(1, round(max_workers * SECTIONS_PER_WORKER * sum(len(s.lines) for s in sections) / total_lines))
+        for batch in _batch_sections(sections, share):
+            batches.append(batch)
+            layouts.append(layout)
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=process_pool_context()) as pool:
+        frames = list(pool.map(_parse_sections, batches, layouts))
+    return pd.concat(frames, ignore_index=True) if frames else _empty_lic_frame()
+
+
+def extract_all_lic_data_parallel(source, max_workers=None):
+    """Parses the register's agent sections on a process pool.
+
+    Results are concatenated in file order, so the output is identical to the
+    serial parser.
+    """
+    sections = split_register_sections(source)
+    if not sections:
+        return _empty_lic_frame()
+    return parse_register_sections(sections, read_register_layout(source), max_workers)
+
+
+# --- Incremental ingest ---
+def fingerprint_register(source):
+    """Fingerprints each agent's part of the register in one streaming pass.
+
+    Returns {agency code: fingerprint}. The fingerprint is a SHA-1 of the
+    agent's name, agency code and entry lines, so a renamed agent counts as a
+    change while page headers, print dates and page numbers do not. No line is
+    kept once it has been hashed.
+    """
+    hashes, contexts = {}, {}
+    with open_register(source) as file:
+        for _, agent_name, agency_code, line, next_line in _scan_entries(file):
+            if agency_code not in hashes:
+                hashes[agency_code] = hashlib.sha1()
+            if contexts.get(agency_code) != agent_name:
+                # Headers repeat on every page; hash the name and code once per change
+                contexts[agency_code] = agent_name
+                hashes[agency_code].update(f"{agent_name}\n{agency_code}\n".encode("utf-8"))
+            hashes[agency_code].update(f"{line}\n{next_line}\n".encode("utf-8"))
+
+    return {code: digest.hexdigest() for code, digest in hashes.items()}
+
+
+def extract_all_lic_data(source, max_workers=None):
+    """Parses LIC text file and extracts relevant policy data into a DataFrame.
+
+    Large registers are parsed in parallel; pass ``max_workers=1`` to force a
+    serial pass.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers > 1 and _source_size(source) >= PARALLEL_MIN_BYTES:
+        return extract_all_lic_data_parallel(source, max_workers=workers)
+
+    frames = list(iter_lic_data_chunks(source))
+    if not frames:
+        return _empty_lic_frame()
+    return pd.concat(frames, ignore_index=True)
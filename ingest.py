@@ -0,0 +1,509 @@
+# ingest.py
+from collections import namedtuple
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text, inspect, bindparam
+from bulk_loader import BATCH_SIZE, LoadStats, bulk_insert, upsert_batches
+from extractor import LIC_DATA_COLUMNS, LIC_DATE_COLUMNS, normalize_lic_dates, fingerprint_register, iter_lic_data_chunks
+from extract_premium_summary import extract_from_pdf, extract_from_txt
+from parse_cache import content_hash, iter_or_parse_chunks
+from lic_summary import LIC_SUMMARY_DDL, rebuild_lic_summary, refresh_lic_summary
+
+# lic_data keyed on Policy No; row_hash lets re-uploads skip unchanged policies.
+# LIC_DATA_DDL takes the table name: lic_data, or lic_data_new while upgrading
+LIC_DATA_COLUMNS_DDL = """
+        `Agent Name` VARCHAR(100),
+        `Agency Code` VARCHAR(20),
+        `Date of Proposal` DATE,
+        `Proposal No` VARCHAR(20),
+        `Short Name` VARCHAR(100),
+        `Policy No` VARCHAR(50) NOT NULL,
+        `Date of Completion` DATE,
+        `DOC` DATE,
+        `Plan` VARCHAR(10),
+        `Term` INT,
+        `Mode` VARCHAR(20),
+        `Premium` DECIMAL(12,2),
+        `Remarks` VARCHAR(255),
+        `ANANDA` VARCHAR(10),
+        `ENACH Date` VARCHAR(10),
+        `uploaded_by` VARCHAR(50),
+        `row_hash` BIGINT UNSIGNED,
+        PRIMARY KEY (`Policy No`)
+"""
+
+LIC_DATA_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        %s,
+        KEY idx_lic_agency (`Agency Code`),
+        KEY idx_lic_doc (`DOC`),
+        KEY idx_lic_plan (`Plan`),
+        KEY idx_lic_mode (`Mode`)
+    )
+""" % LIC_DATA_COLUMNS_DDL.strip()
+
+# Staging copy of lic_data: same columns and key, none of its secondary or FULLTEXT
+# indexes (CREATE ... LIKE would copy the FULLTEXT key, which InnoDB refuses on a
+# temporary table)
+LIC_DATA_STAGING_DDL = f"CREATE TEMPORARY TABLE lic_data_staging ({LIC_DATA_COLUMNS_DDL})"
+
+# Secondary indexes of LIC_DATA_DDL, for tables created before they were added
+LIC_DATA_INDEXES = {
+    "idx_lic_agency": "`Agency Code`",
+    "idx_lic_doc": "`DOC`",
+    "idx_lic_plan": "`Plan`",
+    "idx_lic_mode": "`Mode`",
+}
+
+LIC_DB_COLUMNS = LIC_DATA_COLUMNS + ["uploaded_by", "row_hash"]
+
+UpsertResult = namedtuple("UpsertResult", ["inserted", "updated", "unchanged", "load"])
+
+# What an ingest run ended with; status is "saved", "skipped", "empty" or "conflict"
+IngestOutcome = namedtuple("IngestOutcome", ["status", "message", "rows"])
+
+PREMIUM_COLUMNS = ["agency_code", "report_month", "total_premium", "fp_sch_prem", "fy_sch_prem", "uploaded_by"]
+PREMIUM_KEY = ["agency_code", "report_month", "uploaded_by"]
+
+# Takes the table name: premium_summary, or premium_summary_new while upgrading
+PREMIUM_SUMMARY_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        agency_code VARCHAR(50) NOT NULL,
+        report_month VARCHAR(20) NOT NULL,
+        total_premium DECIMAL(15,2),
+        fp_sch_prem DECIMAL(15,2),
+        fy_sch_prem DECIMAL(15,2),
+        uploaded_by VARCHAR(50) NOT NULL,
+        UNIQUE KEY uq_premium_agent_month (agency_code, report_month, uploaded_by),
+        KEY idx_premium_uploader_month (uploaded_by, report_month)
+    )
+"""
+
+# One content hash per (month, uploader), so re-uploads are compared without reading the rows
+PREMIUM_MONTHS_DDL = """
+    CREATE TABLE IF NOT EXISTS premium_months (
+        report_month VARCHAR(20) NOT NULL,
+        uploaded_by VARCHAR(50) NOT NULL,
+        content_hash CHAR(64) NOT NULL,
+        row_count INT,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+        PRIMARY KEY (report_month, uploaded_by)
+    )
+"""
+
+
+def _no_report(phase, progress, rows=None):
+    pass
+
+
+def _quote(column):
+    return f"`{column}`"
+
+
+# --- Schema ---
+def ensure_ingest_tables(engine):
+    """Creates lic_data and the upload bookkeeping tables if they are missing.
+
+    Runs outside the ingest transaction, since MySQL commits implicitly on DDL.
+    A lic_data table from before keyed upserts (no row_hash) is upgraded once.
+    """
+    columns = []
+    if inspect(engine).has_table("lic_data"):
+        columns = [col["name"] for col in inspect(engine).get_columns("lic_data")]
+    if columns and "row_hash" not in columns:
+        _upgrade_legacy_lic_data(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text(LIC_DATA_DDL.format(table="lic_data")))
+        conn.execute(text(LIC_SUMMARY_DDL))
+        ensure_register_uploads_table(conn)
+        ensure_register_sections_table(conn)
+
+
+def _upgrade_legacy_lic_data(engine):
+    """Reloads an untyped, unkeyed lic_data into the keyed table, keeping the old one as a backup.
+
+    The rows are loaded into lic_data_new and swapped in with one atomic
+    RENAME TABLE, so if the reload fails the legacy lic_data is still in place
+    and the upgrade runs again next time.
+    """
+    legacy = normalize_lic_dates(pd.read_sql("SELECT * FROM lic_data", con=engine))
+    backup = f"lic_data_legacy_{datetime.now():%Y%m%d%H%M%S}"
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS lic_data_new"))  # Left over from a failed upgrade
+        conn.execute(text(LIC_DATA_DDL.format(table="lic_data_new")))
+
+    legacy = legacy.dropna(subset=["Policy No"]) if "Policy No" in legacy.columns else legacy.iloc[0:0]
+    if not legacy.empty:
+        legacy = legacy.drop_duplicates(subset=["Policy No"], keep="last")
+        with engine.begin() as conn:
+            upsert_lic_data(conn, legacy, uploaded_by=None, table="lic_data_new")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"RENAME TABLE lic_data TO `{backup}`, lic_data_new TO lic_data"))
+        conn.execute(text(LIC_SUMMARY_DDL))
+        rebuild_lic_summary(conn)
+
+
+# --- lic_data upsert ---
+def row_hashes(df):
+    """Stable 64-bit content hash of each row's lic_data fields."""
+    content = df[LIC_DATA_COLUMNS].copy()
+    for col in LIC_DATE_COLUMNS:
+        content[col] = content[col].dt.strftime("%Y-%m-%d")
+    return pd.util.hash_pandas_object(content.astype(str), index=False).to_numpy()
+
+
+def prepare_lic_rows(df, uploaded_by):
+    """Shapes extractor output into lic_data rows: typed values, uploader and row_hash."""
+    rows = df.reindex(columns=LIC_DATA_COLUMNS).copy()
+    rows = normalize_lic_dates(rows)
+    rows["Premium"] = pd.to_numeric(rows["Premium"], errors="coerce")
+    rows["Term"] = pd.to_numeric(rows["Term"], errors="coerce").astype("Int64")
+    rows["uploaded_by"] = df["uploaded_by"] if uploaded_by is None and "uploaded_by" in df.columns else uploaded_by
+    rows["row_hash"] = row_hashes(rows)
+    return rows
+
+
+def _stage_rows(conn, chunks, uploaded_by, batch_size=BATCH_SIZE):
+    """Loads the chunks into lic_data_staging one by one; a later row replaces an earlier one with its Policy No."""
+    conn.execute(text("DROP TEMPORARY TABLE IF EXISTS lic_data_staging"))
+    conn.execute(text(LIC_DATA_STAGING_DDL))
+    rows, seconds, methods = 0, 0.0, []
+    for chunk in chunks:
+        chunk = prepare_lic_rows(chunk, uploaded_by).drop_duplicates(subset=["Policy No"], keep="last")
+        stats = bulk_insert(conn, "lic_data_staging", chunk[LIC_DB_COLUMNS], batch_size=batch_size, replace=True)
+        rows, seconds = rows + stats.rows, seconds + stats.seconds
+        if stats.method not in methods and stats.rows:
+            methods.append(stats.method)
+    return LoadStats(rows, seconds, " + ".join(methods) or "none")
+
+
+def upsert_lic_data(conn, chunks, uploaded_by, batch_size=BATCH_SIZE, table="lic_data"):
+    """Merges new register rows into lic_data (or ``table``) on Policy No.
+
+    ``chunks`` is one DataFrame or an iterable of them (see
+    extractor.iter_lic_data_chunks); they are bulk-loaded into a temporary
+    staging table one at a time and merged with one INSERT ... SELECT ... ON
+    DUPLICATE KEY UPDATE; policies whose row_hash is unchanged are filtered out
+    and never rewritten. lic_summary is refreshed for the agents whose rows
+    changed in lic_data. Run it inside ``engine.begin()`` so the whole merge is
+    one transaction.
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    load = _stage_rows(conn, chunks, uploaded_by, batch_size)
+    staged = conn.execute(text("SELECT COUNT(*) FROM lic_data_staging")).scalar()
+
+    new, changed = conn.execute(text(f"""
+        SELECT COALESCE(SUM(d.`Policy No` IS NULL), 0),
+               COALESCE(SUM(d.`Policy No` IS NOT NULL AND NOT (d.row_hash <=> s.row_hash)), 0)
+        FROM lic_data_staging s
+        LEFT JOIN {table} d ON d.`Policy No` = s.`Policy No`
+    """)).fetchone()
+
+    # Agents whose summary rows change: those of new or changed rows, before and after the merge
+    # (two statements, since MySQL cannot open a temporary table twice in one query)
+    changed_rows = "WHERE d.`Policy No` IS NULL OR NOT (d.row_hash <=> s.row_hash)"
+    affected = {code for (code,) in conn.execute(text(f"""
+        SELECT DISTINCT s.`Agency Code` FROM lic_data_staging s
+        LEFT JOIN {table} d ON d.`Policy No` = s.`Policy No` {changed_rows}
+    """))}
+    affected |= {code for (code,) in conn.execute(text(f"""
+        SELECT DISTINCT d.`Agency Code` FROM lic_data_staging s
+        LEFT JOIN {table} d ON d.`Policy No` = s.`Policy No` {changed_rows}
+    """))}
+
+    columns = ", ".join(_quote(col) for col in LIC_DB_COLUMNS)
+    source_columns = ", ".join(f"s.{_quote(col)}" for col in LIC_DB_COLUMNS)
+    updates = ", ".join(f"{_quote(col)} = VALUES({_quote(col)})" for col in LIC_DB_COLUMNS if col != "Policy No")
+    conn.execute(text(f"""
+        INSERT INTO {table} ({columns})
+        SELECT {source_columns}
+        FROM lic_data_staging s
+        LEFT JOIN {table} d ON d.`Policy No` = s.`Policy No`
+        WHERE d.`Policy No` IS NULL OR NOT (d.row_hash <=> s.row_hash)
+        ON DUPLICATE KEY UPDATE {updates}
+    """))
+    conn.execute(text("DROP TEMPORARY TABLE IF EXISTS lic_data_staging"))
+    if table == "lic_data":
+        refresh_lic_summary(conn, affected)
+
+    new, changed = int(new), int(changed)
+    return UpsertResult(inserted=new, updated=changed, unchanged=int(staged) - new - changed, load=load)
+
+
+# --- Upload bookkeeping ---
+def ensure_register_uploads_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS register_uploads (
+            content_hash CHAR(64) PRIMARY KEY,
+            uploaded_by VARCHAR(50),
+            row_count INT,
+            uploaded_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def register_already_ingested(conn, digest):
+    """True if a register with this content hash was already saved to the tenant DB."""
+    row = conn.execute(
+        text("SELECT 1 FROM register_uploads WHERE content_hash = :h"), {"h": digest}
+    ).fetchone()
+    return row is not None
+
+
+def record_register_ingest(conn, digest, uploaded_by, row_count):
+    conn.execute(
+        text("""
+            INSERT INTO register_uploads (content_hash, uploaded_by, row_count)
+            VALUES (:h, :up, :n)
+            ON DUPLICATE KEY UPDATE uploaded_by = VALUES(uploaded_by), row_count = VALUES(row_count)
+        """),
+        {"h": digest, "up": uploaded_by, "n": row_count},
+    )
+
+
+def ensure_register_sections_table(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS register_sections (
+            agency_code VARCHAR(20) PRIMARY KEY,
+            fingerprint CHAR(40) NOT NULL,
+            uploaded_by VARCHAR(50),
+            updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """))
+
+
+def get_section_fingerprints(conn):
+    """Returns {agency code: fingerprint} of the agent sections last ingested."""
+    rows = conn.execute(text("SELECT agency_code, fingerprint FROM register_sections")).fetchall()
+    return {code: fingerprint for code, fingerprint in rows}
+
+
+def save_section_fingerprints(conn, fingerprints, uploaded_by):
+    """Stores {agency code: fingerprint} for the sections just ingested."""
+    if not fingerprints:
+        return
+    conn.execute(
+        text("""
+            INSERT INTO register_sections (agency_code, fingerprint, uploaded_by)
+            VALUES (:code, :fp, :up)
+            ON DUPLICATE KEY UPDATE fingerprint = VALUES(fingerprint), uploaded_by = VALUES(uploaded_by)
+        """),
+        [{"code": code, "fp": fp, "up": uploaded_by} for code, fp in fingerprints.items()],
+    )
+
+
+# --- Full ingest runs (called from the background job pool) ---
+def ingest_register(engine, data, uploaded_by, report=_no_report):
+    """Parses an uploaded proposal register and merges it into lic_data.
+
+    ``report(phase, progress, rows=None)`` is called as the run moves along.
+    """
+    return ingest_registers(engine, [data], uploaded_by, report)
+
+
+def ingest_registers(engine, files, uploaded_by, report=_no_report):
+    """Ingests several registers (one per DO or branch) as a single upload.
+
+    The tenant must be migrated first (migrations.ensure_migrated), which also
+    creates the tables. Each file is fingerprinted in one streaming pass; the changed agents'
+    entries are then parsed chunk by chunk and streamed into the staging table
+    (later files win), and everything is merged in one transaction, so memory
+    stays around one chunk whatever the size of the upload.
+    """
+    report("checking", 0.05)
+    digests = [content_hash(data) for data in files]
+    with engine.connect() as conn:
+        pending = [(digest, data) for digest, data in zip(digests, files)
+                   if not register_already_ingested(conn, digest)]
+        known = get_section_fingerprints(conn)
+
+    if not pending:
+        return IngestOutcome("skipped", "These registers were already uploaded. Nothing to update.", 0)
+
+    # Find the agents whose part of the register changed since the last upload, file by file
+    report("scanning", 0.15)
+    changed_files, changed, parsed_sections, total_sections = [], {}, [], 0
+    for _, data in pending:
+        fingerprints = fingerprint_register(data)
+        total_sections += len(fingerprints)
+        file_changed = {code: fp for code, fp in fingerprints.items() if known.get(code) != fp}
+        if file_changed:
+            changed_files.append((data, set(file_changed)))
+            changed.update(file_changed)
+            parsed_sections.append(",".join(f"{code}:{fp}" for code, fp in sorted(file_changed.items())))
+
+    if not changed:
+        with engine.begin() as conn:
+            for digest, _ in pending:
+                record_register_ingest(conn, digest, uploaded_by, 0)
+        return IngestOutcome("skipped", "No agent sections changed since the last upload. Nothing to update.", 0)
+
+    # Parse the changed agents only, cached by every file's (agency code, fingerprint)
+    # pairs in upload order, and stream the chunks into lic_data in one transaction
+    report("parsing", 0.3)
+    parse_key = content_hash("\n".join(parsed_sections).encode("utf-8"))
+
+    def changed_chunks():
+        for data, codes in changed_files:
+            yield from iter_lic_data_chunks(data, agency_codes=codes)
+
+    def reported(chunks):
+        loaded = 0
+        for chunk in chunks:
+            loaded += len(chunk)
+            report("loading", 0.6, rows=loaded)
+            yield chunk
+
+    with engine.begin() as conn:
+        result = upsert_lic_data(conn, reported(iter_or_parse_chunks(parse_key, changed_chunks)), uploaded_by)
+        rows = result.inserted + result.updated + result.unchanged
+        if rows:
+            save_section_fingerprints(conn, changed, uploaded_by)
+            for digest, _ in pending:
+                record_register_ingest(conn, digest, uploaded_by, rows)
+
+    if not rows:
+        return IngestOutcome("empty", "No valid data found in uploaded file.", 0)
+    return IngestOutcome(
+        "saved",
+        f"{result.inserted} new and {result.updated} updated proposals saved "
+        f"({result.unchanged} unchanged, {len(changed)} of {total_sections} agent sections changed"
+        f"{f' across {len(pending)} files' if len(pending) > 1 else ''}). "
+        f"Loaded {result.load}.",
+        rows,
+    )
+
+
+# --- premium_summary ---
+def ensure_premium_tables(engine):
+    """Creates premium_summary (unique per agent, month and uploader) and premium_months.
+
+    A premium_summary from before the unique key is replaced once by a keyed copy
+    of its rows (first copy of a duplicate wins) and its month hashes seeded; the
+    legacy table is kept as a backup.
+    """
+    if inspect(engine).has_table("premium_summary"):
+        indexes = {index["name"] for index in inspect(engine).get_indexes("premium_summary")}
+        if "uq_premium_agent_month" not in indexes:
+            _upgrade_legacy_premium_summary(engine)
+        elif "idx_premium_uploader_month" not in indexes:
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE premium_summary ADD INDEX idx_premium_uploader_month (uploaded_by, report_month)"))
+
+    with engine.begin() as conn:
+        conn.execute(text(PREMIUM_SUMMARY_DDL.format(table="premium_summary")))
+        conn.execute(text(PREMIUM_MONTHS_DDL))
+
+
+def _upgrade_legacy_premium_summary(engine):
+    """Copies the legacy rows into premium_summary_new, then swaps it in with one atomic RENAME."""
+    columns = ", ".join(PREMIUM_COLUMNS)
+    backup = f"premium_summary_legacy_{datetime.now():%Y%m%d%H%M%S}"
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS premium_summary_new"))  # Left over from a failed upgrade
+        conn.execute(text(PREMIUM_SUMMARY_DDL.format(table="premium_summary_new")))
+        conn.execute(text(PREMIUM_MONTHS_DDL))
+
+    with engine.begin() as conn:
+        conn.execute(text(f"INSERT IGNORE INTO premium_summary_new ({columns}) SELECT {columns} FROM premium_summary"))
+        legacy = pd.read_sql(text(f"SELECT {columns} FROM premium_summary_new"), conn)
+        for uploaded_by, rows in legacy.groupby("uploaded_by"):
+            _save_month_hashes(conn, rows, uploaded_by)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"RENAME TABLE premium_summary TO `{backup}`, premium_summary_new TO premium_summary"))
+
+
+def premium_month_hashes(premium_df):
+    """{report_month: SHA-256 of that month's agent figures}, independent of row order and number formatting."""
+    figures = premium_df[["report_month", "agency_code"]].astype(str).copy()
+    for col in ("total_premium", "fp_sch_prem", "fy_sch_prem"):
+        figures[col] = pd.to_numeric(premium_df[col], errors="coerce").map("{:.2f}".format)
+
+    hashes = {}
+    for month, rows in figures.groupby("report_month"):
+        lines = sorted("|".join(row) for row in rows.drop(columns="report_month").itertuples(index=False, name=None))
+        hashes[month] = content_hash("\n".join(lines).encode("utf-8"))
+    return hashes
+
+
+def _save_month_hashes(conn, premium_df, uploaded_by):
+    counts = premium_df["report_month"].value_counts()
+    conn.execute(
+        text("""
+            INSERT INTO premium_months (report_month, uploaded_by, content_hash, row_count)
+            VALUES (:rm, :up, :h, :n)
+            ON DUPLICATE KEY UPDATE content_hash = VALUES(content_hash), row_count = VALUES(row_count)
+        """),
+        [{"rm": month, "up": uploaded_by, "h": digest, "n": int(counts[month])}
+         for month, digest in premium_month_hashes(premium_df).items()],
+    )
+
+
+def ingest_premium_summary(engine, data, filename, uploaded_by, force=False, report=_no_report):
+    """Parses a premium summary (PDF or TXT) and upserts it into premium_summary.
+
+    Each month in the file is compared with what this uploader saved before
+    through its stored content hash: identical months are skipped, and a month
+    holding different figures is left alone ("conflict") unless ``force`` is set.
+    The tenant must be migrated first (migrations.ensure_migrated).
+    """
+    # Extract data based on file type, straight from the uploaded bytes
+    report("parsing", 0.1)
+    if filename.endswith(".pdf"):
+        premium_df = extract_from_pdf(data)
+    else:
+        premium_df = extract_from_txt(data)
+
+    if premium_df.empty:
+        return IngestOutcome("empty", "No agent totals found in the premium summary.", 0)
+
+    # Clean and prepare data
+    premium_df.rename(columns={"Report Month": "report_month"}, inplace=True)
+    premium_df["agency_code"] = premium_df["Agency Code"].str.strip().str.upper()
+    premium_df["uploaded_by"] = uploaded_by
+    premium_df = premium_df.drop_duplicates(subset=PREMIUM_KEY, keep="last")
+    new_hashes = premium_month_hashes(premium_df)
+
+    report("comparing", 0.4, rows=len(premium_df))
+    with engine.begin() as conn:
+        stored = dict(conn.execute(
+            text("SELECT report_month, content_hash FROM premium_months WHERE uploaded_by = :up AND report_month IN :months")
+            .bindparams(bindparam("months", expanding=True)),
+            {"up": uploaded_by, "months": sorted(new_hashes)},
+        ).fetchall())
+
+        conflicts = sorted(m for m, h in new_hashes.items() if m in stored and stored[m] != h)
+        if conflicts and not force:
+            return IngestOutcome("conflict", f"Data for {', '.join(conflicts)} already exists and does not match. Upload skipped.", 0)
+
+        months = sorted(m for m, h in new_hashes.items() if stored.get(m) != h)
+        if not months:
+            return IngestOutcome("skipped", f"Data for {', '.join(sorted(new_hashes))} matches what is already saved. Nothing to update.", 0)
+
+        # Upsert the changed months, then drop agents that are no longer in them
+        report("loading", 0.7, rows=len(premium_df))
+        rows = premium_df[premium_df["report_month"].isin(months)]
+        stats = upsert_batches(conn, "premium_summary", rows[PREMIUM_COLUMNS], PREMIUM_KEY)
+        for month, month_rows in rows.groupby("report_month"):
+            conn.execute(
+                text("""
+                    DELETE FROM premium_summary
+                    WHERE report_month = :rm AND uploaded_by = :up AND agency_code NOT IN :codes
+                """).bindparams(bindparam("codes", expanding=True)),
+                {"rm": month, "up": uploaded_by, "codes": month_rows["agency_code"].tolist()},
+            )
+        _save_month_hashes(conn, rows, uploaded_by)
+
+    label = ", ".join(months)
+    if conflicts:
+        message = f"Data for {', '.join(conflicts)} forcibly overwritten."
+    elif any(m in stored for m in months):
+        message = f"Data for {label} updated."
+    else:
+        message = "Premium summary uploaded and saved."
+    return IngestOutcome("saved", f"{message} Loaded {stats}.", len(rows))
@@ -0,0 +1,96 @@
+# jobs.py
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# One pool per Streamlit server process, shared by every session
+MAX_WORKERS = 4
+MAX_FINISHED_JOBS = 200
+
+ACTIVE_STATUSES = ("queued", "running")
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ingest")
+_jobs = {}
+_lock = threading.Lock()
+
+
+def submit_job(kind, name, owner, func, *args, **kwargs):
+    """Queues ``func(*args, report=..., **kwargs)`` on the worker pool and returns the job id.
+
+    ``owner`` is (db_name, username); the job outlives the Streamlit script run
+    and the browser session that started it.
+    """
+    job_id = uuid.uuid4().hex
+    with _lock:
+        _jobs[job_id] = {
+            "id": job_id,
+            "kind": kind,
+            "name": name,
+            "owner": owner,
+            "status": "queued",
+            "phase": "queued",
+            "progress": 0.0,
+            "rows": None,
+            "message": "",
+            "timings": {},
+            "created": time.time(),
+            "finished": None,
+        }
+        _trim_finished()
+    _executor.submit(_run, job_id, func, args, kwargs)
+    return job_id
+
+
+def _update(job_id, **fields):
+    with _lock:
+        _jobs[job_id].update(fields)
+
+
+def _run(job_id, func, args, kwargs):
+    phase_started = [time.time(), None]
+
+    def report(phase, progress, rows=None):
+        now = time.time()
+        with _lock:
+            job = _jobs[job_id]
+            if phase_started[1]:
+                job["timings"][phase_started[1]] = now - phase_started[0]
+            phase_started[:] = [now, phase]
+            job.update(status="running", phase=phase, progress=progress)
+            if rows is not None:
+                job["rows"] = rows
+
+    try:
+        outcome = func(*args, report=report, **kwargs)
+        report("done", 1.0, rows=outcome.rows)
+        _update(job_id, status=outcome.status, message=outcome.message, finished=time.time())
+    except Exception as e:
+        print(f"[JOB ERROR] {job_id}: {e}")
+        _update(job_id, status="failed", message=str(e), finished=time.time())
+
+
+def _trim_finished():
+    finished = sorted(
+        (job for job in _jobs.values() if job["status"] not in ACTIVE_STATUSES),
+        key=lambda job: job["created"],
+    )
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job["id"]]
+
+
+def get_job(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        return dict(job, timings=dict(job["timings"])) if job else None
+
+
+def list_jobs(owner, limit=5):
+    """Most recent jobs of this (db_name, username), newest first."""
+    with _lock:
+        jobs = [dict(job, timings=dict(job["timings"])) for job in _jobs.values() if job["owner"] == owner]
+    return sorted(jobs, key=lambda job: job["created"], reverse=True)[:limit]
+
+
+def is_active(job):
+    return job["status"] in ACTIVE_STATUSES
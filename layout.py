@@ -1,7 +1,6 @@
 # layout.py
 import streamlit as st
-from datetime import datetime
-from utils import get_agency_year_ranges, get_financial_year_options
+from utils import year_filter_options
 
 def render_sidebar():
     role = st.session_state.get("role", "")
@@ -27,13 +26,8 @@ def render_sidebar():
 
 
 def render_year_filters(start_date, prefix=""):
-    if isinstance(start_date, datetime):
-        start_str = start_date.strftime("%Y-%m-%d")
-    else:
-        start_str = str(start_date)
-
-    year_options = get_agency_year_ranges(start_str)
-    fin_year_options = get_financial_year_options()
+    # The same option lists utils.get_session_year_offsets precomputes DOC offsets for
+    year_options, fin_year_options = year_filter_options(start_date)
 
     prefix = "agent" if st.session_state.role == "agent" else "admin"
     label = "📆 Agency Year" if st.session_state.role == "agent" else "📆 Appraisal Year"
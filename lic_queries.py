@@ -0,0 +1,185 @@
+# lic_queries.py
+import importlib.util
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text, bindparam
+from extractor import LIC_DATA_COLUMNS, normalize_lic_dates
+from search import SEARCH_COLUMNS, fulltext_query
+
+# pyarrow ships with streamlit; without it, free-text columns stay Python strings
+COMPACT_STRING_DTYPE = "string[pyarrow]" if importlib.util.find_spec("pyarrow") else None
+
+# Few distinct values per tenant: one small integer code per row instead of a string
+LIC_CATEGORY_COLUMNS = ["Agent Name", "Agency Code", "Plan", "Mode", "ANANDA", "ENACH Date", "Remarks"]
+# Unique per policy: contiguous Arrow string buffers instead of one Python object per cell
+LIC_STRING_COLUMNS = ["Policy No", "Proposal No", "Short Name"]
+
+
+def _quote(column):
+    return f"`{column}`"
+
+
+def compact_lic_frame(df):
+    """lic_data columns as compact types: categoricals, numeric Premium/Term and datetime64 dates."""
+    df = normalize_lic_dates(df)
+    for col in df.columns:
+        if col in LIC_CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif col in LIC_STRING_COLUMNS and COMPACT_STRING_DTYPE:
+            df[col] = df[col].astype(COMPACT_STRING_DTYPE)
+    if "Premium" in df.columns:
+        df["Premium"] = pd.to_numeric(df["Premium"], errors="coerce")
+    if "Term" in df.columns:
+        df["Term"] = pd.to_numeric(df["Term"], errors="coerce").astype("Int16")
+    return df
+
+
+def frame_memory(df):
+    """Deep memory use per column (bytes) and in total, for reporting."""
+    usage = df.memory_usage(index=True, deep=True)
+    return {"total": int(usage.sum()), "rows": len(df), "columns": {col: int(size) for col, size in usage.items()}}
+
+
+def agency_year_range(selected_year):
+    """(start, end) of an agency year label "dd/mm/YYYY - dd/mm/YYYY", or None for "All Years"."""
+    if not selected_year or selected_year == "All Years":
+        return None
+    try:
+        start_str, end_str = selected_year.split(" - ")
+        return datetime.strptime(start_str.strip(), "%d/%m/%Y"), datetime.strptime(end_str.strip(), "%d/%m/%Y")
+    except ValueError:
+        return None
+
+
+def financial_year_range(selected_fin_year):
+    """(1 April, 31 March) of a financial year label "YYYY-YYYY", or None for "All Financial Years"."""
+    if not selected_fin_year or selected_fin_year == "All Financial Years":
+        return None
+    try:
+        start_year, end_year = map(int, selected_fin_year.split("-"))
+        return datetime(start_year, 4, 1), datetime(end_year, 3, 31)
+    except ValueError:
+        return None
+
+
+def _lic_filters(agency_code=None, doc_ranges=(), plans=None, modes=None, search=None):
+    """(WHERE conditions, params, expanding bindparams) shared by every lic_data query."""
+    where, params, expanding = [], {}, []
+
+    if agency_code:
+        where.append("`Agency Code` = :agency_code")
+        params["agency_code"] = agency_code.strip().upper()
+
+    for i, doc_range in enumerate(r for r in doc_ranges if r):
+        start, end = doc_range
+        where.append(f"`DOC` BETWEEN :doc_start_{i} AND :doc_end_{i}")
+        params[f"doc_start_{i}"], params[f"doc_end_{i}"] = start, end
+
+    for name, column, values in (("plans", "Plan", plans), ("modes", "Mode", modes)):
+        if values:
+            where.append(f"{_quote(column)} IN :{name}")
+            params[name] = [str(v) for v in values]
+            expanding.append(bindparam(name, expanding=True))
+
+    boolean_search = fulltext_query(search) if search else None
+    if boolean_search:
+        where.append(f"MATCH({', '.join(_quote(col) for col in SEARCH_COLUMNS)}) AGAINST (:search IN BOOLEAN MODE)")
+        params["search"] = boolean_search
+
+    return where, params, expanding
+
+
+def _statement(sql, where, expanding):
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    statement = text(sql)
+    return statement.bindparams(*expanding) if expanding else statement
+
+
+def build_lic_query(columns=None, agency_code=None, doc_ranges=(), plans=None, modes=None, order_by=None, search=None):
+    """Returns (statement, params) selecting lic_data rows that match every given filter.
+
+    ``doc_ranges`` is a list of inclusive (start, end) DOC ranges, all of which must
+    hold (e.g. agency year and financial year); None entries are ignored. ``plans``
+    and ``modes`` are lists of allowed values. ``search`` goes through the
+    ft_lic_search FULLTEXT index. Only ``columns`` are selected.
+    """
+    columns = [col for col in (columns or LIC_DATA_COLUMNS) if col in LIC_DATA_COLUMNS]
+    where, params, expanding = _lic_filters(agency_code, doc_ranges, plans, modes, search)
+    statement = _statement(f"SELECT {', '.join(_quote(col) for col in columns)} FROM lic_data", where, expanding)
+    if order_by:
+        statement = text(f"{statement.text} ORDER BY {_quote(order_by)}").bindparams(*expanding)
+    return statement, params
+
+
+def query_lic_data(engine, columns=None, agency_code=None, doc_ranges=(), plans=None, modes=None, order_by=None, search=None):
+    """Reads only the matching lic_data rows and columns, in the compact types of compact_lic_frame."""
+    statement, params = build_lic_query(columns, agency_code, doc_ranges, plans, modes, order_by, search)
+    return compact_lic_frame(pd.read_sql(statement, con=engine, params=params))
+
+
+def count_lic_data(engine, agency_code=None, doc_ranges=(), plans=None, modes=None, search=None):
+    """COUNT(*) of the matching rows, answered from the lic_data indexes."""
+    where, params, expanding = _lic_filters(agency_code, doc_ranges, plans, modes, search)
+    with engine.connect() as conn:
+        return conn.execute(_statement("SELECT COUNT(*) FROM lic_data", where, expanding), params).scalar()
+
+
+def count_lic_by_plan(engine, agency_code=None, doc_ranges=(), plans=None, modes=None, search=None):
+    """Proposals and ANANDA proposals per plan of the matching rows, in the layout of summary_by(..., "plan").
+
+    Unlike lic_summary it honours ``search`` (the FULLTEXT semantic of the paged grid).
+    """
+    where, params, expanding = _lic_filters(agency_code, doc_ranges, plans, modes, search)
+    statement = _statement(
+        "SELECT `Plan` AS plan, COUNT(*) AS proposals, SUM(UPPER(TRIM(`ANANDA`)) = 'YES') AS ananda FROM lic_data",
+        where, expanding,
+    )
+    statement = text(f"{statement.text} GROUP BY `Plan` ORDER BY proposals DESC").bindparams(*expanding)
+    return pd.read_sql(statement, engine, params=params)
+
+
+# Keyset orders: each ends on the primary key so every row has a unique position
+PAGE_ORDERS = {"Policy No": ["Policy No"], "DOC": ["DOC", "Policy No"]}
+
+
+def fetch_lic_page(engine, columns, order="Policy No", after=None, page_size=100,
+                   agency_code=None, doc_ranges=(), plans=None, modes=None, search=None):
+    """One page of matching rows by keyset: the ``page_size`` rows that sort after ``after``.
+
+    ``after`` is the cursor returned with the previous page (None for the first).
+    Returns (DataFrame, cursor of the next page or None on the last page). The
+    cost of a page does not grow with its position, unlike OFFSET.
+    """
+    keys = PAGE_ORDERS[order]
+    columns = list(dict.fromkeys([col for col in columns if col in LIC_DATA_COLUMNS] + keys))
+    where, params, expanding = _lic_filters(agency_code, doc_ranges, plans, modes, search)
+
+    if after is not None and order == "Policy No":
+        where.append("`Policy No` > :after_policy")
+        params["after_policy"] = after[0]
+    elif after is not None:
+        # NULL DOCs sort first in MySQL, so the cursor may still be inside them
+        after_doc, after_policy = after
+        if after_doc is None:
+            where.append("((`DOC` IS NULL AND `Policy No` > :after_policy) OR `DOC` IS NOT NULL)")
+        else:
+            where.append("(`DOC` > :after_doc OR (`DOC` = :after_doc AND `Policy No` > :after_policy))")
+            params["after_doc"] = after_doc
+        params["after_policy"] = after_policy
+
+    order_sql = ", ".join(_quote(col) for col in keys)
+    sql = f"SELECT {', '.join(_quote(col) for col in columns)} FROM lic_data"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    statement = text(f"{sql} ORDER BY {order_sql} LIMIT :page_size")
+    if expanding:
+        statement = statement.bindparams(*expanding)
+    params["page_size"] = int(page_size)
+
+    page = normalize_lic_dates(pd.read_sql(statement, con=engine, params=params))
+    if len(page) < page_size:
+        return page, None
+    last = page.iloc[-1]
+    cursor = tuple(None if pd.isna(last[col]) else (last[col].date() if col == "DOC" else last[col]) for col in keys)
+    return page, cursor
@@ -0,0 +1,108 @@
+# lic_summary.py
+import pandas as pd
+from sqlalchemy import text, bindparam
+
+# Proposal counts and premium per agent, DOC day, Plan and Mode, kept in step with
+# lic_data by the ingest path. Agency years start on each user's own start date,
+# so they are answered as DOC range sums; financial years are stored directly.
+LIC_SUMMARY_DDL = """
+    CREATE TABLE IF NOT EXISTS lic_summary (
+        agency_code VARCHAR(20),
+        agent_name VARCHAR(100),
+        doc DATE,
+        fin_year CHAR(9),
+        plan VARCHAR(10),
+        mode VARCHAR(20),
+        proposals INT NOT NULL,
+        ananda INT NOT NULL,
+        premium DECIMAL(15,2),
+        KEY idx_summary_agency_doc (agency_code, doc),
+        KEY idx_summary_doc (doc),
+        KEY idx_summary_fin_year (fin_year)
+    )
+"""
+
+_FIN_YEAR = """
+    CASE WHEN MONTH(`DOC`) >= 4 THEN CONCAT(YEAR(`DOC`), '-', YEAR(`DOC`) + 1)
+         ELSE CONCAT(YEAR(`DOC`) - 1, '-', YEAR(`DOC`)) END
+"""
+
+_SUMMARY_SELECT = f"""
+    SELECT `Agency Code`, MAX(`Agent Name`), `DOC`, {_FIN_YEAR}, `Plan`, `Mode`,
+           COUNT(*), SUM(UPPER(TRIM(`ANANDA`)) = 'YES'), SUM(`Premium`)
+    FROM lic_data
+"""
+_SUMMARY_GROUP = " GROUP BY `Agency Code`, `DOC`, `Plan`, `Mode`"
+_SUMMARY_COLUMNS = "agency_code, agent_name, doc, fin_year, plan, mode, proposals, ananda, premium"
+
+
+def rebuild_lic_summary(conn):
+    """Recomputes lic_summary from the whole of lic_data."""
+    conn.execute(text("DELETE FROM lic_summary"))
+    conn.execute(text(f"INSERT INTO lic_summary ({_SUMMARY_COLUMNS}) {_SUMMARY_SELECT} {_SUMMARY_GROUP}"))
+
+
+def refresh_lic_summary(conn, agency_codes):
+    """Recomputes the summary rows of the given agents only (those an ingest touched)."""
+    codes = [code for code in agency_codes if code is not None]
+    if not codes:
+        return
+    conn.execute(
+        text("DELETE FROM lic_summary WHERE agency_code IN :codes").bindparams(bindparam("codes", expanding=True)),
+        {"codes": codes},
+    )
+    conn.execute(
+        text(f"INSERT INTO lic_summary ({_SUMMARY_COLUMNS}) {_SUMMARY_SELECT} WHERE `Agency Code` IN :codes {_SUMMARY_GROUP}")
+        .bindparams(bindparam("codes", expanding=True)),
+        {"codes": codes},
+    )
+
+
+def _summary_filters(agency_code=None, doc_ranges=(), plans=None, modes=None):
+    where, params, expanding = [], {}, []
+    if agency_code:
+        where.append("agency_code = :agency_code")
+        params["agency_code"] = agency_code.strip().upper()
+    for i, doc_range in enumerate(r for r in doc_ranges if r):
+        where.append(f"doc BETWEEN :doc_start_{i} AND :doc_end_{i}")
+        params[f"doc_start_{i}"], params[f"doc_end_{i}"] = doc_range
+    for name, column, values in (("plans", "plan", plans), ("modes", "mode", modes)):
+        if values:
+            where.append(f"{column} IN :{name}")
+            params[name] = [str(v) for v in values]
+            expanding.append(bindparam(name, expanding=True))
+    return (" WHERE " + " AND ".join(where) if where else ""), params, expanding
+
+
+def summary_totals(engine, agency_code=None, doc_ranges=(), plans=None, modes=None):
+    """(proposals, ANANDA proposals, premium) of the matching policies."""
+    where, params, expanding = _summary_filters(agency_code, doc_ranges, plans, modes)
+    statement = text(f"SELECT COALESCE(SUM(proposals), 0), COALESCE(SUM(ananda), 0), COALESCE(SUM(premium), 0) FROM lic_summary{where}")
+    with engine.connect() as conn:
+        proposals, ananda, premium = conn.execute(statement.bindparams(*expanding), params).fetchone()
+    return int(proposals), int(ananda), float(premium)
+
+
+def summary_by(engine, group_by, agency_code=None, doc_ranges=(), plans=None, modes=None):
+    """Proposals, ANANDA and premium per ``group_by`` ("agency_code", "fin_year", "plan" or "mode"), largest first."""
+    if group_by not in ("agency_code", "fin_year", "plan", "mode"):
+        raise ValueError(f"Cannot group lic_summary by {group_by!r}")
+    label = "agency_code, MAX(agent_name) AS agent_name" if group_by == "agency_code" else group_by
+    where, params, expanding = _summary_filters(agency_code, doc_ranges, plans, modes)
+    statement = text(f"""
+        SELECT {label}, SUM(proposals) AS proposals, SUM(ananda) AS ananda, SUM(premium) AS premium
+        FROM lic_summary{where}
+        GROUP BY {group_by}
+        ORDER BY proposals DESC
+    """)
+    return pd.read_sql(statement.bindparams(*expanding), engine, params=params)
+
+
+def plan_count_table(plan_summary):
+    """summary_by(..., "plan") in the one-row layout of utils.get_policy_count_by_plan."""
+    plan_summary = plan_summary.dropna(subset=["plan"])
+    if plan_summary.empty:
+        return pd.DataFrame()
+    table = pd.DataFrame([plan_summary["proposals"].astype(int).tolist()], columns=plan_summary["plan"].astype(str).tolist())
+    table.index = ["Policy Count"]
+    return table
@@ -0,0 +1,209 @@
+# migrations.py
+"""Versioned schema migrations for the per-admin ``lic_*`` databases.
+
+Each tenant records the migrations it has applied in ``schema_migrations``;
+running the migrator again only applies what is missing, so it is safe at
+every startup and from the command line:
+
+    python migrations.py                 # every lic_* database
+    python migrations.py --db lic_ABC    # selected databases
+    python migrations.py --status        # applied version per database
+"""
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text, inspect
+from engines import get_engine, create_unpooled_engine
+from ingest import LIC_DATA_INDEXES, ensure_ingest_tables, ensure_premium_tables
+from search import FULLTEXT_INDEX, SEARCH_COLUMNS
+from lic_summary import LIC_SUMMARY_DDL, rebuild_lic_summary
+from data_cache import bump_data_version
+
+MAX_WORKERS = 4
+LOCK_TIMEOUT = 60  # seconds to wait for another process migrating the same database
+
+SCHEMA_MIGRATIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(200) NOT NULL,
+        applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+def _keyed_lic_data(engine):
+    # Typed lic_data keyed on Policy No, plus the upload bookkeeping tables;
+    # TEXT tables written by to_sql and the old admin_utils table are reloaded
+    ensure_ingest_tables(engine)
+
+
+def _keyed_premium_summary(engine):
+    ensure_premium_tables(engine)
+
+
+def _lic_data_indexes(engine):
+    existing = {index["name"] for index in inspect(engine).get_indexes("lic_data")}
+    missing = [f"ADD INDEX {name} ({column})" for name, column in LIC_DATA_INDEXES.items() if name not in existing]
+    if missing:
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE lic_data {', '.join(missing)}"))
+
+
+def _lic_data_fulltext(engine):
+    # Backs the optional search push-down in lic_queries.build_lic_query(search=...)
+    existing = {index["name"] for index in inspect(engine).get_indexes("lic_data")}
+    if FULLTEXT_INDEX not in existing:
+        columns = ", ".join(f"`{col}`" for col in SEARCH_COLUMNS)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE lic_data ADD FULLTEXT INDEX {FULLTEXT_INDEX} ({columns})"))
+
+
+def _lic_summary(engine):
+    with engine.begin() as conn:
+        conn.execute(text(LIC_SUMMARY_DDL))
+        rebuild_lic_summary(conn)
+
+
+# (version, name, step); steps must be idempotent, new ones go at the end
+MIGRATIONS = [
+    (1, "lic_data keyed on Policy No", _keyed_lic_data),
+    (2, "premium_summary unique per agent and month", _keyed_premium_summary),
+    (3, "lic_data indexes on Agency Code, DOC, Plan and Mode", _lic_data_indexes),
+    (4, "lic_data FULLTEXT search index", _lic_data_fulltext),
+    (5, "lic_summary rollups of proposals and premium", _lic_summary),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_versions(engine):
+    if not inspect(engine).has_table("schema_migrations"):
+        return set()
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def migrate_tenant(db_name, engine=None):
+    """Applies the pending migrations to one tenant database and returns their versions."""
+    engine = engine or get_engine(db_name)
+    with engine.connect() as lock_conn:
+        # Other app processes may be starting up against the same database
+        got_lock = lock_conn.execute(
+            text("SELECT GET_LOCK(:name, :timeout)"), {"name": f"migrate_{db_name}", "timeout": LOCK_TIMEOUT}
+        ).scalar()
+        if not got_lock:
+            raise RuntimeError(f"Timed out waiting for another migration of {db_name}")
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+            done = applied_versions(engine)
+
+            applied = []
+            for version, name, step in MIGRATIONS:
+                if version in done:
+                    continue
+                step(engine)
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT IGNORE INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                        {"v": version, "n": name},
+                    )
+                applied.append(version)
+            return applied
+        finally:
+            lock_conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": f"migrate_{db_name}"})
+
+
+_migrated = set()  # Tenants this process has brought to LATEST_VERSION
+
+
+def ensure_migrated(db_name):
+    """Migrates ``db_name`` unless this process already did; waits for a migration already running.
+
+    Upload jobs and dashboards call this before touching the tenant's tables,
+    so they never race the startup migration with DDL of their own.
+    """
+    if db_name in _migrated:
+        return
+    if migrate_tenant(db_name):
+        bump_data_version(db_name)
+    _migrated.add(db_name)
+
+
+def list_tenant_databases():
+    with get_engine().connect() as conn:
+        return [row[0] for row in conn.execute(text(r"SHOW DATABASES LIKE 'lic\_%'"))]
+
+
+def _migrate_unpooled(db_name):
+    engine = create_unpooled_engine(db_name)
+    try:
+        return migrate_tenant(db_name, engine)
+    finally:
+        engine.dispose()
+
+
+def migrate_all(db_names=None, max_workers=MAX_WORKERS):
+    """Migrates every tenant database (or ``db_names``) in parallel.
+
+    Returns {db_name: list of applied versions, or the exception that stopped it};
+    one failing tenant does not stop the others. Throwaway engines are used so
+    the shared registry keeps serving the live sessions; a tenant that had
+    migrations applied gets its data_version bumped, so cached frames reload.
+    """
+    db_names = list(db_names or list_tenant_databases())
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="migrate") as pool:
+        futures = {db_name: pool.submit(_migrate_unpooled, db_name) for db_name in db_names}
+        for db_name, future in futures.items():
+            try:
+                results[db_name] = future.result()
+                if results[db_name]:
+                    bump_data_version(db_name)
+                _migrated.add(db_name)
+            except Exception as e:
+                print(f"[MIGRATION ERROR] {db_name}: {e}")
+                results[db_name] = e
+    return results
+
+
+_startup_lock = threading.Lock()
+_startup_started = False
+
+
+def migrate_on_startup():
+    """Migrates every tenant once per process, in a background thread."""
+    global _startup_started
+    with _startup_lock:
+        if _startup_started:
+            return
+        _startup_started = True
+    threading.Thread(target=migrate_all, name="migrate-startup", daemon=True).start()
+
+
+def _print_status(db_names):
+    for db_name in db_names:
+        engine = create_unpooled_engine(db_name)
+        try:
+            versions = applied_versions(engine)
+        finally:
+            engine.dispose()
+        current = max(versions, default=0)
+        print(f"{db_name}: version {current}/{LATEST_VERSION}{'' if current == LATEST_VERSION else ' (pending)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply lic_data / premium_summary schema migrations.")
+    parser.add_argument("--db", action="append", help="tenant database to migrate (repeatable); default: every lic_* database")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--status", action="store_true", help="only show the applied version of each database")
+    args = parser.parse_args()
+
+    targets = args.db or list_tenant_databases()
+    if args.status:
+        _print_status(targets)
+    else:
+        for db_name, result in migrate_all(targets, args.workers).items():
+            if isinstance(result, Exception):
+                print(f"❌ {db_name}: {result}")
+            else:
+                print(f"✅ {db_name}: {'applied ' + ', '.join(map(str, result)) if result else 'up to date'}")
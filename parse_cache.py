@@ -0,0 +1,75 @@
+# parse_cache.py
+import hashlib
+import os
+import pickle
+
+# Parsed registers, one file of pickled chunks per content hash, evicted least-recently-used first
+CACHE_DIR = ".parse_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def content_hash(data):
+    """SHA-256 hex digest of the uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_path(digest):
+    return os.path.join(CACHE_DIR, f"{digest}.pkl")
+
+
+def evict_cache(max_bytes=CACHE_MAX_BYTES):
+    """Deletes the least recently used entries until the cache fits in ``max_bytes``."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".pkl"):
+            stat = os.stat(os.path.join(CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except FileNotFoundError:
+            pass  # Already evicted by another session
+        total -= size
+
+
+def iter_or_parse_chunks(digest, parse_chunks):
+    """Yields ``parse_chunks()``'s DataFrames for this content hash, one at a time.
+
+    A miss streams the parse through while appending each chunk to the cache
+    entry; the entry only appears once the last chunk is written. A hit reads
+    the chunks back one by one, so neither side holds the whole parse.
+    """
+    path = _cache_path(digest)
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                os.utime(path)  # Mark as recently used
+                while True:
+                    try:
+                        yield pickle.load(f)
+                    except EOFError:
+                        return
+        except (OSError, pickle.UnpicklingError) as e:
+            # Chunks may already have been consumed, so fail this run; the next one re-parses
+            print(f"[CACHE ERROR] Dropping unreadable entry {path}: {e}")
+            os.remove(path)
+            raise
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            for chunk in parse_chunks():
+                pickle.dump(chunk, f, protocol=pickle.HIGHEST_PROTOCOL)
+                yield chunk
+        os.replace(tmp_path, path)  # Atomic, so a concurrent reader never sees half a file
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    evict_cache()
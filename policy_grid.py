@@ -0,0 +1,55 @@
+# policy_grid.py
+import math
+import streamlit as st
+from lic_queries import PAGE_ORDERS, count_lic_data, fetch_lic_page
+from utils import get_mysql_connection
+
+PAGE_SIZES = [50, 100, 250, 500]
+DEFAULT_PAGE_SIZE = 100
+
+
+def show_policy_grid(display_cols, key_prefix, **filters):
+    """Pages through the matching lic_data rows in SQL, sending only ``display_cols`` of one page.
+
+    ``filters`` are passed to lic_queries (agency_code, doc_ranges, plans, modes,
+    search). The keyset cursors of the visited pages live in session state and
+    start over whenever the filters, order or page size change.
+    """
+    engine = get_mysql_connection(st.session_state["db_name"])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        order = st.selectbox("↕️ Sort by", list(PAGE_ORDERS), key=f"{key_prefix}_grid_order")
+    with col2:
+        page_size = st.selectbox(
+            "📄 Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE), key=f"{key_prefix}_grid_size"
+        )
+
+    cursors_key, signature_key = f"{key_prefix}_grid_cursors", f"{key_prefix}_grid_signature"
+    signature = repr((order, page_size, sorted(filters.items())))
+    if st.session_state.get(signature_key) != signature:
+        st.session_state[signature_key] = signature
+        st.session_state[cursors_key] = [None]
+    cursors = st.session_state[cursors_key]
+
+    total = count_lic_data(engine, **filters)
+    columns = [col for col in display_cols if col != "S.No."]
+    page, next_cursor = fetch_lic_page(engine, columns, order, cursors[-1], page_size, **filters)
+
+    page_no = len(cursors)
+    page.insert(0, "S.No.", range((page_no - 1) * page_size + 1, (page_no - 1) * page_size + len(page) + 1))
+    if "DOC" in page.columns:
+        page["DOC"] = page["DOC"].dt.strftime("%d/%m/%Y")
+    st.dataframe(page[[col for col in display_cols if col in page.columns]], use_container_width=True, hide_index=True)
+
+    prev_col, info_col, next_col = st.columns([1, 3, 1])
+    with prev_col:
+        if st.button("⬅️ Previous", key=f"{key_prefix}_grid_prev", disabled=page_no == 1):
+            cursors.pop()
+            st.rerun()
+    with info_col:
+        st.caption(f"Page {page_no} of {max(1, math.ceil(total / page_size))} · {total} proposals")
+    with next_col:
+        if st.button("Next ➡️", key=f"{key_prefix}_grid_next", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
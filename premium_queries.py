@@ -0,0 +1,48 @@
+# premium_queries.py
+import pandas as pd
+from sqlalchemy import text
+
+# Report months are MM/YYYY strings; order them by year, then month
+_MONTH_ORDER = "RIGHT(report_month, 4) DESC, LEFT(report_month, 2) DESC"
+
+
+def get_report_months(engine, uploaded_by):
+    """Distinct report months this admin has uploaded, newest first (served by idx_premium_uploader_month)."""
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"""
+                SELECT DISTINCT report_month FROM premium_summary
+                WHERE uploaded_by = :up AND report_month IS NOT NULL
+                ORDER BY {_MONTH_ORDER}
+            """),
+            {"up": uploaded_by},
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def get_month_summary(engine, uploaded_by, report_month):
+    """Agent rows of a single report month."""
+    return pd.read_sql(
+        text("""
+            SELECT agency_code, report_month, total_premium, fp_sch_prem, fy_sch_prem
+            FROM premium_summary
+            WHERE uploaded_by = :up AND report_month = :rm
+            ORDER BY agency_code
+        """),
+        engine,
+        params={"up": uploaded_by, "rm": report_month},
+    )
+
+
+def get_eligible_premium(engine, uploaded_by, report_month):
+    """fp_sch_prem + fy_sch_prem summed over a report month, NULLs counted as zero."""
+    with engine.connect() as conn:
+        total = conn.execute(
+            text("""
+                SELECT COALESCE(SUM(fp_sch_prem), 0) + COALESCE(SUM(fy_sch_prem), 0)
+                FROM premium_summary
+                WHERE uploaded_by = :up AND report_month = :rm
+            """),
+            {"up": uploaded_by, "rm": report_month},
+        ).scalar()
+    return float(total or 0)
@@ -0,0 +1,46 @@
+# search.py
+import re
+import pandas as pd
+
+# Fields a policy can be found by from the dashboard search box
+SEARCH_COLUMNS = ["Policy No", "Short Name", "Agent Name", "Agency Code", "Plan"]
+FULLTEXT_INDEX = "ft_lic_search"
+
+_FIELD_SEPARATOR = "\x00"  # never typed, so a match cannot span two fields
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+def normalize_search_text(text):
+    return " ".join(str(text).lower().split())
+
+
+def build_search_keys(df):
+    """One normalised search key per row (same index as ``df``) over the SEARCH_COLUMNS it has."""
+    columns = [col for col in SEARCH_COLUMNS if col in df.columns]
+    if not columns or df.empty:
+        return pd.Series("", index=df.index, dtype=object)
+    fields = [
+        df[col].astype(str).where(df[col].notna(), "").str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+        for col in columns
+    ]
+    keys = fields[0]
+    for field in fields[1:]:
+        keys = keys + _FIELD_SEPARATOR + field
+    return keys
+
+
+def search_mask(keys, query):
+    """Boolean mask of the rows whose key contains every word of ``query``."""
+    mask = pd.Series(True, index=keys.index)
+    for term in normalize_search_text(query).split():
+        mask &= keys.str.contains(term, regex=False)
+    return mask
+
+
+def fulltext_query(query):
+    """``query`` as a MySQL boolean-mode FULLTEXT search (every word, as a prefix), or None if empty.
+
+    InnoDB ignores words shorter than innodb_ft_min_token_size (3 by default).
+    """
+    terms = _BOOLEAN_OPERATORS.sub(" ", normalize_search_text(query)).split()
+    return " ".join(f"+{term}*" for term in terms) or None
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from doc_index import DocIndex, doc_slice, intersect_offsets
+from lic_queries import agency_year_range, financial_year_range
+
+
+def _lic_frame(n=2_000, seed=7):
+    rng = np.random.default_rng(seed)
+    docs = pd.Series(pd.to_datetime("2015-01-01") + pd.to_timedelta(rng.integers(0, 3_650, n), unit="D"))
+    docs[rng.random(n) < 0.05] = pd.NaT
+    return pd.DataFrame({"Policy No": [f"P{i:06d}" for i in range(n)], "DOC": docs})
+
+
+def _masked(df, start, end):
+    return df[(df["DOC"] >= start) & (df["DOC"] <= end)]
+
+
+def _same_rows(a, b):
+    return sorted(a["Policy No"]) == sorted(b["Policy No"])
+
+
+def test_doc_index_ranges_match_boolean_masks():
+    df = _lic_frame()
+    index = DocIndex(df)
+    ranges = {
+        "fy": financial_year_range("2018-2019"),
+        "agency year": agency_year_range("15/06/2020 - 14/06/2021"),
+        "single day": (pd.Timestamp("2017-03-03"), pd.Timestamp("2017-03-03")),
+        "before data": (pd.Timestamp("2000-01-01"), pd.Timestamp("2001-01-01")),
+        "all": None,
+    }
+    offsets = index.boundary_offsets(ranges)
+    for label, bounds in ranges.items():
+        rows = index.slice(*offsets[label])
+        if bounds is None:
+            assert len(rows) == len(df)
+        else:
+            assert _same_rows(rows, _masked(df, *bounds)), label
+            assert _same_rows(index.between(*bounds), rows), label
+
+
+def test_intersected_offsets_and_doc_slice_match_masks():
+    df = _lic_frame()
+    index = DocIndex(df)
+    year, fin = agency_year_range("01/10/2018 - 30/09/2019"), financial_year_range("2019-2020")
+    offsets = index.boundary_offsets({"year": year, "fin": fin})
+
+    both = index.slice(*intersect_offsets(offsets["year"], offsets["fin"]))
+    assert _same_rows(both, _masked(_masked(df, *year), *fin))
+
+    start, end = pd.Timestamp("2019-05-01"), pd.Timestamp("2019-08-31")
+    assert _same_rows(doc_slice(both, start, end), _masked(both, start, end))
+
+
+def test_search_keys_follow_the_sorted_frame():
+    df = _lic_frame(n=500)
+    index = DocIndex(df, search=True)
+    lo, hi = index.offsets(pd.Timestamp("2016-01-01"), pd.Timestamp("2018-12-31"))
+    rows, keys = index.slice(lo, hi), index.search_keys.iloc[lo:hi]
+    assert list(keys) == [policy.lower() for policy in rows["Policy No"]]
+    assert DocIndex(df).search_keys is None
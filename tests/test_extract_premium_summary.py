@@ -0,0 +1,32 @@
+from extract_premium_summary import _legacy_parse_summary_text, _synthetic_summary, parse_summary_text
+
+
+def test_block_parser_matches_legacy_regex_on_well_formed_input():
+    text = _synthetic_summary(500)
+    new, legacy = parse_summary_text(text), _legacy_parse_summary_text(text)
+    assert list(new.columns) == list(legacy.columns)
+    assert new.astype(str).values.tolist() == legacy.astype(str).values.tolist()
+
+
+def test_block_missing_a_field_does_not_borrow_the_next_agents():
+    text = _synthetic_summary(10, missing_fy_from=5)
+    df = parse_summary_text(text)
+    assert len(df) == 10
+    assert df["fy_sch_prem"][:5].notna().all()
+    assert df["fy_sch_prem"][5:].isna().all()
+
+
+def test_multi_line_blocks_and_months():
+    text = (
+        "PREMIUM SUMMARY FOR THE MONTH OF 03/2025\n"
+        "TOTAL FOR AGENT : 0000001c\n  PREMIUM : 100.00\n  FP Sch.Prem : 10.00\n  FY Sch.Prem : 1.00\n"
+        "PREMIUM SUMMARY FOR THE MONTH OF 04/2025\n"
+        "TOTAL FOR AGENT : 0000002C\n  PREMIUM : 200.00\n  FP Sch.Prem : 20.00\n  FY Sch.Prem : 2.00\n"
+    )
+    df = parse_summary_text(text)
+    assert df.astype(str).values.tolist() == [
+        ["0000001C", "100.00", "10.00", "1.00", "03/2025"],
+        ["0000002C", "200.00", "20.00", "2.00", "04/2025"],
+    ]
+    # The legacy regex never matched across lines
+    assert _legacy_parse_summary_text(text).empty
@@ -0,0 +1,91 @@
+import datetime
+import os
+import pandas as pd
+import pytest
+import extractor
+from extractor import (
+    extract_all_lic_data, fingerprint_register, iter_lic_data_chunks, normalize_lic_dates,
+    parse_register_sections, read_register_layout, split_register_sections,
+)
+
+REGISTER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "latest_uploaded.txt")
+
+
+@pytest.fixture(scope="module")
+def register():
+    with open(REGISTER, "rb") as f:
+        return f.read()
+
+
+def test_parallel_parse_matches_serial(register, monkeypatch):
+    serial = extract_all_lic_data(register, max_workers=1)
+    assert len(serial) > 0
+
+    monkeypatch.setattr(extractor, "PARALLEL_MIN_LINES", 0)
+    parallel = parse_register_sections(split_register_sections(register), read_register_layout(register), max_workers=2)
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_bytes_path_and_stream_sources_parse_alike(register):
+    from_bytes = extract_all_lic_data(register, max_workers=1)
+    pd.testing.assert_frame_equal(extract_all_lic_data(REGISTER, max_workers=1), from_bytes)
+    with open(REGISTER, "r", encoding="utf-8") as f:
+        pd.testing.assert_frame_equal(extract_all_lic_data(f, max_workers=1), from_bytes)
+
+
+def test_normalize_lic_dates_mixed_input():
+    df = pd.DataFrame({
+        "DOC": ["2023-09-08", "08/09/2023", "2023-09-08 00:00:00", datetime.date(2023, 9, 8),
+                "31/01/2024", "", None, "not a date"],
+        "Date of Proposal": pd.to_datetime(["2024-01-02"] * 8),
+    })
+    df = normalize_lic_dates(df)
+
+    assert pd.api.types.is_datetime64_any_dtype(df["DOC"])
+    assert list(df["DOC"][:5]) == [pd.Timestamp("2023-09-08")] * 4 + [pd.Timestamp("2024-01-31")]
+    assert df["DOC"][5:].isna().all()
+    assert (df["Date of Proposal"] == pd.Timestamp("2024-01-02")).all()
+
+
+def test_chunks_stream_the_same_rows(register):
+    whole = extract_all_lic_data(register, max_workers=1)
+    chunks = list(iter_lic_data_chunks(register, chunk_size=100))
+    assert len(chunks) > 1 and all(len(chunk) <= 100 for chunk in chunks)
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), whole)
+
+
+def test_chunks_keep_only_the_selected_agents(register):
+    whole = extract_all_lic_data(register, max_workers=1)
+    codes = set(whole["Agency Code"].unique()[:3])
+    selected = pd.concat(iter_lic_data_chunks(register, agency_codes=codes), ignore_index=True)
+    pd.testing.assert_frame_equal(selected, whole[whole["Agency Code"].isin(codes)].reset_index(drop=True))
+
+
+def _fingerprints(data):
+    return fingerprint_register(data)
+
+
+def _changed(before, after):
+    return {code for code in after if before.get(code) != after[code]}
+
+
+def test_fingerprints_change_only_for_the_edited_agent(register):
+    text = register.decode("utf-8")
+    before = _fingerprints(register)
+    assert len(before) > 1
+
+    _, _, code, entry, _ = next(extractor._scan_entries(text.splitlines()))
+    edited = text.replace(entry, entry.replace("|", "| ", 1), 1).encode("utf-8")
+
+    assert _changed(before, _fingerprints(edited)) == {code}
+    assert _fingerprints(register) == before
+
+
+def test_fingerprints_detect_an_agent_renamed(register):
+    text = register.decode("utf-8")
+    before = _fingerprints(register)
+
+    name_line = next(line for line in text.splitlines() if "Name of the agent" in line)
+    renamed = text.replace(name_line, name_line.rstrip() + " X").encode("utf-8")
+
+    assert len(_changed(before, _fingerprints(renamed))) == 1
@@ -0,0 +1,34 @@
+import pandas as pd
+import parse_cache
+
+
+def test_chunks_are_cached_and_read_back_one_by_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path))
+    chunks = [pd.DataFrame({"Policy No": [f"P{i}{j}" for j in range(3)]}) for i in range(4)]
+    calls = []
+
+    def parse():
+        calls.append(1)
+        yield from chunks
+
+    first = list(parse_cache.iter_or_parse_chunks("abc", parse))
+    second = list(parse_cache.iter_or_parse_chunks("abc", parse))
+
+    assert len(calls) == 1
+    for got, want in zip(second, chunks):
+        pd.testing.assert_frame_equal(got, want)
+    assert len(first) == len(second) == len(chunks)
+
+
+def test_a_parse_that_fails_leaves_no_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(parse_cache, "CACHE_DIR", str(tmp_path))
+
+    def parse():
+        yield pd.DataFrame({"Policy No": ["P1"]})
+        raise ValueError("bad register")
+
+    try:
+        list(parse_cache.iter_or_parse_chunks("abc", parse))
+    except ValueError:
+        pass
+    assert list(tmp_path.iterdir()) == []
@@ -2,8 +2,7 @@
 import pandas as pd
 import streamlit as st
 from sqlalchemy import text
-from sqlalchemy import create_engine
-from db_config import DB_CONFIG
+from engines import get_engine
 from db_utils import get_mysql_connection
 
 # utils.py or logging_utils.py
@@ -13,6 +12,11 @@ from db_utils import get_mysql_connection
 import pandas as pd
 
 from db_utils import get_admin_by_do_code, user_exists, add_pending_user
+from lic_queries import query_lic_data, count_lic_by_plan, frame_memory, agency_year_range, financial_year_range
+from data_cache import get_or_load, cache_stats
+from lic_summary import summary_totals, summary_by, plan_count_table
+from migrations import ensure_migrated
+from doc_index import DocIndex, intersect_offsets
 
 
 
@@ -130,54 +134,128 @@ def log_login(username):
 
 
 def get_mysql_connection(db_name=None):
-    """Returns a SQLAlchemy engine for the given database."""
-    if db_name is None:
-        db_name = DB_CONFIG["database"]
+    """Returns the shared pooled SQLAlchemy engine for the given database."""
+    return get_engine(db_name)
+
+def _lic_cache_key(columns, agency_code, doc_ranges):
+    return (
+        tuple(columns) if columns else None,
+        agency_code.strip().upper() if agency_code else None,
+        tuple(r for r in doc_ranges if r),
+    )
 
-    return create_engine(
-        f"mysql+mysqlconnector://{DB_CONFIG['user']}:{DB_CONFIG['password']}@{DB_CONFIG['host']}/{db_name}"
+def _load_doc_index(db_name, columns, agency_code):
+    """Reads and indexes the lic_data frame of a data_cache miss, logging its size and the cache's."""
+    df = query_lic_data(get_mysql_connection(db_name), columns=columns, agency_code=agency_code)
+    memory, stats = frame_memory(df), cache_stats()
+    print(
+        f"[CACHE] Loaded {db_name} lic_data{' for ' + agency_code if agency_code else ''}: "
+        f"{memory['rows']} rows, {memory['total'] / 2**20:.1f} MiB | cache {stats['entries']} frames, "
+        f"{stats['bytes'] / 2**20:.1f} MiB, {stats['hits']} hits / {stats['misses']} misses / {stats['evictions']} evictions"
     )
+    return DocIndex(df, search=True)
+
+def load_lic_doc_index(columns=None, agency_code=None):
+    """All of the tenant's (or one agent's) lic_data as a DOC-sorted DocIndex, cached until the next upload.
 
-def load_lic_data_from_db():
-    engine = get_mysql_connection(st.session_state["db_name"])
+    Year, financial-year and DOC ranges are then positional slices of it
+    (see get_session_year_offsets) instead of new queries or boolean masks;
+    its search_keys are built with it, so they share its row positions.
+    """
+    db_name = st.session_state["db_name"]
+    key = ("doc_index",) + _lic_cache_key(columns, agency_code, ())
     try:
-        df = pd.read_sql("SELECT * FROM lic_data", con=engine)
+        return get_or_load(
+            db_name, key,
+            lambda: _load_doc_index(db_name, columns, agency_code),
+        )
     except Exception as e:
         st.error(f"Failed to load data: {e}")
-        df = pd.DataFrame()
-    return df
+        return DocIndex(pd.DataFrame(columns=columns or ["DOC"]), search=True)
+
+def year_filter_options(start_date):
+    """(agency year labels, financial year labels) offered by layout.render_year_filters."""
+    start_str = start_date.strftime("%Y-%m-%d") if isinstance(start_date, datetime) else str(start_date)
+    return get_agency_year_ranges(start_str), get_financial_year_options()
+
+def get_session_year_offsets(doc_index, columns=None, agency_code=None):
+    """(lo, hi) rows of doc_index matching the sidebar Agency Year and Financial Year selections.
+
+    The offsets of every option of both selectors are found with one vectorised
+    searchsorted per DocIndex and start date, and cached with it.
+    """
+    start_date = st.session_state.get("start_date")
+    year_options, fin_year_options = year_filter_options(start_date)
+
+    def boundaries():
+        ranges = {("year", label): agency_year_range(label) for label in year_options}
+        ranges.update({("fin", label): financial_year_range(label) for label in fin_year_options})
+        return doc_index.boundary_offsets(ranges)
+
+    key = ("doc_offsets", str(start_date)) + _lic_cache_key(columns, agency_code, ())
+    offsets = get_or_load(st.session_state["db_name"], key, boundaries)
+    everything = (0, len(doc_index))
+    return intersect_offsets(
+        offsets.get(("year", st.session_state.get("selected_year", "All Years")), everything),
+        offsets.get(("fin", st.session_state.get("fin_year", "All Financial Years")), everything),
+    )
+
+def load_lic_summary(group_by=None, agency_code=None, doc_ranges=(), plans=None, modes=None):
+    """lic_summary rollups: (proposals, ANANDA, premium) totals, or a frame per ``group_by``.
+
+    Cached with the tenant's lic_data frames until the next upload.
+    """
+    db_name = st.session_state["db_name"]
+    key = ("summary", group_by) + _lic_cache_key(None, agency_code, doc_ranges) + (tuple(plans or ()), tuple(modes or ()))
+    engine = get_mysql_connection(db_name)
+    if group_by is None:
+        return get_or_load(db_name, key, lambda: summary_totals(engine, agency_code, doc_ranges, plans, modes))
+    return get_or_load(db_name, key, lambda: summary_by(engine, group_by, agency_code, doc_ranges, plans, modes))
+
+def ensure_session_migrated():
+    """Brings the session's tenant to the current schema before its dashboard reads it."""
+    try:
+        with st.spinner("Updating database..."):
+            ensure_migrated(st.session_state["db_name"])
+    except Exception as e:
+        print(f"[MIGRATION ERROR] {st.session_state.get('db_name')}: {e}")
+        st.warning(f"⚠️ Database upgrade not finished yet: {e}")
+
+def get_headline_counts(df, sql_filters=None, search=None):
+    """(proposals, ANANDA, plan count table) of the rows on screen.
+
+    Read from lic_summary when ``sql_filters`` describe those rows; with a
+    ``search`` too, counted on lic_data with the FULLTEXT search of the paged
+    grid. Counted from ``df`` otherwise, or when the tables cannot be read (a
+    tenant whose migrations have not created them yet).
+    """
+    if sql_filters is not None:
+        try:
+            if search:
+                plan_summary = count_lic_by_plan(get_mysql_connection(st.session_state["db_name"]), search=search, **sql_filters)
+                return int(plan_summary["proposals"].sum()), int(plan_summary["ananda"].sum()), plan_count_table(plan_summary)
+            proposals, ananda, _ = load_lic_summary(**sql_filters)
+            return proposals, ananda, plan_count_table(load_lic_summary("plan", **sql_filters))
+        except Exception as e:
+            print(f"[SUMMARY ERROR] Counting in memory instead: {e}")
+    ananda = (df["ANANDA"].astype(str).str.strip().str.upper() == "YES").sum()
+    return len(df), ananda, get_policy_count_by_plan(df)
+
+def get_session_doc_ranges():
+    """DOC ranges of the sidebar Agency Year and Financial Year selections."""
+    return [
+        agency_year_range(st.session_state.get("selected_year", "All Years")),
+        financial_year_range(st.session_state.get("fin_year", "All Financial Years")),
+    ]
 
 def get_policy_count_by_plan(df):
     if "Plan" not in df.columns or df["Plan"].dropna().empty:
         return pd.DataFrame()
     plan_counts = df["Plan"].value_counts(dropna=True)
+    plan_counts = plan_counts[plan_counts > 0]  # categorical Plan lists every category, even filtered-out ones
     if plan_counts.empty:
         return pd.DataFrame()
     plan_counts_df = pd.DataFrame(plan_counts).T
     plan_counts_df.index = ["Policy Count"]
     plan_counts_df.columns = plan_counts_df.columns.astype(str)
     return plan_counts_df
-
-def filter_df_by_selected_year(df, selected_year):
-    if selected_year == "All Years":
-        return df
-    try:
-        start_str, end_str = selected_year.split(" - ")
-        start_date = datetime.strptime(start_str.strip(), "%d/%m/%Y")
-        end_date = datetime.strptime(end_str.strip(), "%d/%m/%Y")
-        df["DOC"] = pd.to_datetime(df["DOC"], errors="coerce")
-        return df[(df["DOC"] >= start_date) & (df["DOC"] <= end_date)]
-    except:
-        return df
-
-def filter_df_by_financial_year(df, selected_fin_year):
-    if selected_fin_year == "All Financial Years":
-        return df
-    try:
-        start_year, end_year = map(int, selected_fin_year.split("-"))
-        start_date = datetime(start_year, 4, 1)
-        end_date = datetime(end_year, 3, 31)
-        df["DOC"] = pd.to_datetime(df["DOC"], errors="coerce")
-        return df[(df["DOC"] >= start_date) & (df["DOC"] <= end_date)]
-    except:
-        return df